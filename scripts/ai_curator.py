@@ -4,58 +4,134 @@
 AI 内容筛选模块 - 使用大模型筛选最值得关注的内容
 """
 
-from openai import OpenAI
+import asyncio
+import hashlib
+import html
+import json
+import string
+import time
+from openai import AsyncOpenAI
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 import os
 
+try:
+    # orjson 解析 LLM 返回的 JSON 比 stdlib 快 3-5 倍
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 筛选结果磁盘缓存：cron 式运行经常看到同一批热门内容，
+# 命中时直接返回上次的 HTML，省一次 72B 模型调用
+CACHE_DIR = Path.home() / '.cache' / 'dailyreminder' / 'curator'
+CACHE_TTL = 6 * 3600  # 秒
+
+# 条目卡片模板在模块加载时编译一次，循环里只做 substitute，
+# 同时对动态字段统一 html.escape
+_CARD = string.Template(
+    '<div style="padding: 12px; border-left: 3px solid #4299e1; margin: 10px 0; background: #f7fafc;">'
+    '<div style="font-weight: 600;">'
+    '<a href="$url" target="_blank" style="color: #2b6cb0; text-decoration: none;">$title</a>'
+    '</div>'
+    '<div style="font-size: 13px; color: #718096; margin-top: 5px;">💡 $comment</div>'
+    '</div>'
+)
+
+_FALLBACK_CARD = string.Template(
+    '<div style="padding: 10px; border-left: 3px solid #cbd5e0; margin: 8px 0;">'
+    '<a href="$url" target="_blank" style="color: #2b6cb0;">$title</a>'
+    '</div>'
+)
+
 
 class AICurator:
     """AI 内容筛选器"""
-    
-    def __init__(self, client: OpenAI = None):
+
+    def __init__(self, client: AsyncOpenAI = None):
         if client is None:
             api_key = os.environ.get('MODELSCOPE_API_KEY')
             if not api_key:
                 raise ValueError("请设置 MODELSCOPE_API_KEY 环境变量")
-            self.client = OpenAI(
+            self.client = AsyncOpenAI(
                 base_url='https://api-inference.modelscope.cn/v1/',
                 api_key=api_key
             )
         else:
             self.client = client
-        
+
         self.total_input_tokens = 0
         self.total_output_tokens = 0
         self.calls = 0
-    
+        # 多个 acurate 协程并发运行时保护计数器
+        self._usage_lock = asyncio.Lock()
+
     def curate(
-        self, 
-        items: List[Dict[str, Any]], 
-        context: str, 
+        self,
+        items: List[Dict[str, Any]],
+        context: str,
+        max_items: int = 4,
+        item_format: str = "- {title}"
+    ) -> str:
+        """同步封装：单独调用时直接阻塞等待 acurate 完成"""
+        return asyncio.run(self.acurate(items, context, max_items, item_format))
+
+    async def acurate(
+        self,
+        items: List[Dict[str, Any]],
+        context: str,
         max_items: int = 4,
         item_format: str = "- {title}"
     ) -> str:
         """
-        使用 AI 筛选并总结内容
-        
+        使用 AI 筛选并总结内容（异步，可用 asyncio.gather 并发多个来源）
+
         Args:
             items: 待筛选的内容列表，每个 item 是一个字典
             context: 内容来源描述 (如 "GitHub Issues", "Reddit r/LocalLLaMA")
             max_items: 最多选择的条目数
             item_format: 格式化单个 item 的模板
-        
+
         Returns:
             HTML 格式的筛选结果
         """
         if not items:
             return '<p style="color: #718096;">暂无新内容</p>'
-        
-        # 构建内容列表
-        items_text = "\n".join([
-            f"{i+1}. 标题: {item.get('title', 'N/A')}\n   链接: {item.get('url', 'N/A')}\n   描述: {item.get('description', item.get('summary', ''))[:200]}"
+
+        # 按 URL 去重：同一条内容出现多次既浪费 prompt token
+        # 又可能被模型重复选中
+        seen_urls = set()
+        uniq_items = []
+        for item in items:
+            url = item.get('url')
+            if url and url in seen_urls:
+                continue
+            if url:
+                seen_urls.add(url)
+            uniq_items.append(item)
+        items = uniq_items
+
+        # 以 (来源, 条目 url/title, max_items) 的哈希为键查磁盘缓存
+        cache_key = hashlib.sha256(repr(
+            (context, [(it.get('url'), it.get('title')) for it in items[:15]], max_items)
+        ).encode('utf-8')).hexdigest()
+        cache_file = CACHE_DIR / f'{cache_key}.html'
+        try:
+            if time.time() - cache_file.stat().st_mtime < CACHE_TTL:
+                print(f"  💾 {context}: 命中筛选缓存，跳过 LLM 调用")
+                return cache_file.read_text(encoding='utf-8')
+        except OSError:
+            pass  # 无缓存或已过期
+
+        # 构建内容列表 (生成器直接喂 join，`or` 链短路避免 description
+        # 存在时仍去探 summary、以及对超长字符串的无谓切片)
+        # 模型只需要返回 index，URL 对筛选毫无贡献，不进 prompt；
+        # 描述压到 120 字符，prompt_tokens 直接决定延迟和成本
+        items_text = "\n".join(
+            f"{i+1}. {item.get('title', 'N/A')} | {(item.get('description') or item.get('summary') or '')[:120]}"
             for i, item in enumerate(items[:15])  # 最多处理 15 条
-        ])
-        
+        )
+
         prompt = f"""你是一位资深 AI 技术编辑。以下是今日"**{context}**"的内容列表：
 
 {items_text}
@@ -74,7 +150,7 @@ class AICurator:
 只返回 JSON 数组，不要其他内容。"""
 
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model="Qwen/Qwen3-32B",
                 messages=[
                     {"role": "system", "content": "你是一位专业的 AI 技术内容筛选专家。只返回 JSON 格式的筛选结果。"},
@@ -83,59 +159,63 @@ class AICurator:
                 temperature=0.3,
                 extra_body={"enable_thinking": False}
             )
-            
+
             # 记录 token 使用
             if response.usage:
-                self.total_input_tokens += response.usage.prompt_tokens
-                self.total_output_tokens += response.usage.completion_tokens
-                self.calls += 1
-            
+                async with self._usage_lock:
+                    self.total_input_tokens += response.usage.prompt_tokens
+                    self.total_output_tokens += response.usage.completion_tokens
+                    self.calls += 1
+
             result_text = response.choices[0].message.content.strip()
-            
+
             # 解析 JSON
-            import json
             # 清理可能的 markdown 代码块
             if result_text.startswith("```"):
                 result_text = result_text.split("\n", 1)[1].rsplit("```", 1)[0]
-            
-            selected = json.loads(result_text)
-            
+
+            if orjson is not None:
+                selected = orjson.loads(result_text)
+            else:
+                selected = json.loads(result_text)
+
             # 生成 HTML
             html_parts = []
             for sel in selected[:max_items]:
                 idx = sel.get("index", 1) - 1
                 if 0 <= idx < len(items):
                     item = items[idx]
-                    comment = sel.get("comment", "")
-                    html_parts.append(f'''
-                    <div style="padding: 12px; border-left: 3px solid #4299e1; margin: 10px 0; background: #f7fafc;">
-                        <div style="font-weight: 600;">
-                            <a href="{item.get('url', '#')}" target="_blank" style="color: #2b6cb0; text-decoration: none;">
-                                {item.get('title', 'Untitled')}
-                            </a>
-                        </div>
-                        <div style="font-size: 13px; color: #718096; margin-top: 5px;">
-                            💡 {comment}
-                        </div>
-                    </div>
-                    ''')
-            
-            return '\n'.join(html_parts) if html_parts else '<p style="color: #718096;">暂无精选内容</p>'
-            
+                    html_parts.append(_CARD.substitute(
+                        url=html.escape(item.get('url', '#')),
+                        title=html.escape(item.get('title', 'Untitled')),
+                        comment=html.escape(sel.get("comment", ""))
+                    ))
+
+            result_html = '\n'.join(html_parts) if html_parts else '<p style="color: #718096;">暂无精选内容</p>'
+
+            # 写入缓存 (先写临时文件再原子替换)
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+                tmp_file.write_text(result_html, encoding='utf-8')
+                os.replace(tmp_file, cache_file)
+            except OSError as cache_err:
+                print(f"⚠️ 写入筛选缓存失败: {cache_err}")
+
+            return result_html
+
         except Exception as e:
             print(f"❌ AI 筛选失败: {e}")
             # 降级：直接展示前几条
-            html_parts = []
-            for item in items[:max_items]:
-                html_parts.append(f'''
-                <div style="padding: 10px; border-left: 3px solid #cbd5e0; margin: 8px 0;">
-                    <a href="{item.get('url', '#')}" target="_blank" style="color: #2b6cb0;">
-                        {item.get('title', 'Untitled')}
-                    </a>
-                </div>
-                ''')
+            html_parts = [
+                _FALLBACK_CARD.substitute(
+                    url=html.escape(item.get('url', '#')),
+                    title=html.escape(item.get('title', 'Untitled'))
+                )
+                for item in items[:max_items]
+            ]
             return '\n'.join(html_parts)
-    
+
     def get_usage(self) -> Dict[str, int]:
         """获取 token 使用统计"""
         return {
@@ -5,18 +5,119 @@ arXiv 论文抓取模块
 获取大模型、广告领域的最新论文，并支持按引用数排序
 """
 
-import urllib.request
 import urllib.parse
 import json
-import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
+import os
+import time
+import hashlib
+import tempfile
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # orjson 走 Rust/SIMD 路径，大 payload 下 loads 快 3-5 倍
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # lxml 是 C (libxml2) 实现，解析和 findall 遍历比纯 Python 快数倍
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from io import BytesIO
 from dataclasses import dataclass
 from typing import List, Optional, Dict
 
 
-@dataclass
+# Atom 命名空间的完全限定标签，模块加载时算好
+# 避免每个字段的 find('atom:xxx', ns) 重复做前缀解析
+ATOM_NS = 'http://www.w3.org/2005/Atom'
+_ENTRY = f'{{{ATOM_NS}}}entry'
+_ID = f'{{{ATOM_NS}}}id'
+_TITLE = f'{{{ATOM_NS}}}title'
+_SUMMARY = f'{{{ATOM_NS}}}summary'
+_PUBLISHED = f'{{{ATOM_NS}}}published'
+_UPDATED = f'{{{ATOM_NS}}}updated'
+_AUTHOR = f'{{{ATOM_NS}}}author'
+_NAME = f'{{{ATOM_NS}}}name'
+_LINK = f'{{{ATOM_NS}}}link'
+_CATEGORY = f'{{{ATOM_NS}}}category'
+
+# HTTP 响应磁盘缓存目录 (arXiv/Semantic Scholar 的结果数小时内稳定)
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'dailyreminder')
+
+# 进程内共享的 Keep-Alive 连接池：同一运行里的 4-8 次 arXiv 请求
+# 和 S2 批量请求复用 TCP+TLS 连接，省掉每次 ~100ms 的握手
+_session = requests.Session()
+# 显式要求压缩传输：arXiv 的 XML 响应动辄数百 KB，gzip 后缩小 5-10 倍，
+# requests 收到后会透明解压
+_session.headers['Accept-Encoding'] = 'gzip, deflate'
+# 瞬时故障自动重试：arXiv 偶发 503、S2 经常 429，
+# 指数退避重试比静默丢掉整个分类再人工重跑便宜得多
+_retry = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 500, 502, 503, 504],
+    allowed_methods=['GET', 'POST'],
+)
+_session.mount('http://', HTTPAdapter(max_retries=_retry))
+_session.mount('https://', HTTPAdapter(max_retries=_retry))
+
+
+if orjson is not None:
+    _json_dumps = orjson.dumps  # 直接产出 bytes
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj):
+        return json.dumps(obj).encode('utf-8')
+    _json_loads = json.loads
+
+
+def _cached_urlopen(url: str, body: bytes = None, headers: dict = None, ttl: int = 3600) -> bytes:
+    """
+    带磁盘 TTL 缓存的 HTTP 请求
+
+    以 (url, body) 的哈希为键；TTL 内重复运行（如 CI 重试）直接读本地
+    文件，完全避免网络往返和 30s 超时风险。
+    """
+    key = hashlib.sha256(url.encode('utf-8') + (body or b'')).hexdigest()
+    path = os.path.join(CACHE_DIR, key)
+
+    try:
+        if time.time() - os.path.getmtime(path) < ttl:
+            with open(path, 'rb') as f:
+                return f.read()
+    except OSError:
+        pass  # 缓存不存在或不可读，走网络
+
+    if body is None:
+        response = _session.get(url, headers=headers, timeout=30)
+    else:
+        response = _session.post(url, data=body, headers=headers, timeout=30)
+    response.raise_for_status()
+    data = response.content
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=CACHE_DIR)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)  # 原子替换，并发写时不会读到半个文件
+    except OSError as e:
+        print(f"⚠️ 写入 HTTP 缓存失败: {e}")
+
+    return data
+
+
+@dataclass(slots=True)
 class ArxivPaper:
-    """arXiv 论文数据结构"""
+    """arXiv 论文数据结构 (slots: 字段固定，省掉每实例 __dict__ 的内存开销)"""
     title: str
     authors: List[str]
     summary: str
@@ -37,6 +138,7 @@ class ArxivFetcher:
     
     BASE_URL = "http://export.arxiv.org/api/query"
     SEMANTIC_SCHOLAR_BATCH_URL = "https://api.semanticscholar.org/graph/v1/paper/batch"
+    SEMANTIC_SCHOLAR_BATCH_LIMIT = 500  # 单次 batch 请求的 ID 上限
     
     # 大模型相关关键词
     LLM_KEYWORDS = [
@@ -80,60 +182,64 @@ class ArxivFetcher:
     
     def __init__(self, max_results: int = 20):
         self.max_results = max_results
+        # 关键词 OR 片段在所有分类和所有运行中都一样，构造一次即可
+        self._llm_kw_query = self._build_keyword_query(self.LLM_KEYWORDS)
+        self._ad_kw_query = self._build_keyword_query(self.AD_KEYWORDS)
+
+    @staticmethod
+    def _build_keyword_query(keywords: List[str]) -> str:
+        """将关键词列表组合成 arXiv OR 查询片段"""
+        return " OR ".join([f'ti:"{kw}" OR abs:"{kw}"' for kw in keywords[:5]])
     
-    def _build_query(self, keywords: List[str], category: str = "cs.CL") -> str:
-        """构建 arXiv API 查询字符串"""
-        # 将关键词组合成 OR 查询
-        keyword_query = " OR ".join([f'ti:"{kw}" OR abs:"{kw}"' for kw in keywords[:5]])
-        # 限制分类
-        query = f"({keyword_query}) AND cat:{category}"
-        return query
-    
-    def _parse_entry(self, entry: ET.Element, ns: dict) -> ArxivPaper:
-        """解析单个论文条目"""
+    def _parse_entry(self, entry) -> ArxivPaper:
+        """解析单个论文条目 (一次遍历子节点分组，替代逐字段 find/findall)"""
+        fields = {}
+        for child in entry:
+            fields.setdefault(child.tag, []).append(child)
+
         # 提取 arXiv ID
         # id 格式通常为 http://arxiv.org/abs/2312.11805v1 或 2312.11805
-        full_id = entry.find('atom:id', ns).text
+        full_id = fields[_ID][0].text
         # 去掉版本号以便 Semantic Scholar 识别 (如 2312.11805v1 -> 2312.11805)
-        arxiv_id = full_id.split('/abs/')[-1].split('v')[0] 
-        
+        arxiv_id = full_id.split('/abs/')[-1].split('v')[0]
+
         # 提取标题（去除多余空白）
-        title = entry.find('atom:title', ns).text.strip().replace('\n', ' ')
-        
+        title = fields[_TITLE][0].text.strip().replace('\n', ' ')
+
         # 提取作者列表
         authors = [
-            author.find('atom:name', ns).text 
-            for author in entry.findall('atom:author', ns)
+            author.find(_NAME).text
+            for author in fields.get(_AUTHOR, [])
         ]
-        
+
         # 提取摘要
-        summary = entry.find('atom:summary', ns).text.strip().replace('\n', ' ')
-        
+        summary = fields[_SUMMARY][0].text.strip().replace('\n', ' ')
+
         # 提取时间
-        published = entry.find('atom:published', ns).text
-        updated = entry.find('atom:updated', ns).text
-        
+        published = fields[_PUBLISHED][0].text
+        updated = fields[_UPDATED][0].text
+
         # 提取链接
         pdf_url = ""
         abs_url = ""
-        for link in entry.findall('atom:link', ns):
+        for link in fields.get(_LINK, []):
             if link.get('title') == 'pdf':
                 pdf_url = link.get('href')
             elif link.get('type') == 'text/html':
                 abs_url = link.get('href')
-        
+
         # 如果没有找到 abs_url，使用默认格式
         if not abs_url:
             abs_url = f"https://arxiv.org/abs/{arxiv_id}"
         if not pdf_url:
             pdf_url = f"https://arxiv.org/pdf/{arxiv_id}.pdf"
-        
+
         # 提取分类
         categories = [
-            cat.get('term') 
-            for cat in entry.findall('atom:category', ns)
+            cat.get('term')
+            for cat in fields.get(_CATEGORY, [])
         ]
-        
+
         return ArxivPaper(
             title=title,
             authors=authors,
@@ -146,133 +252,184 @@ class ArxivFetcher:
             categories=categories
         )
     
-    def _fetch_citation_counts(self, papers: List[ArxivPaper]) -> Dict[str, int]:
-        """从 Semantic Scholar 获取引用数"""
-        if not papers:
-            return {}
-            
-        print("🔍 正在从 Semantic Scholar 获取引用数据...")
-        
+    def _fetch_citation_chunk(self, arxiv_ids: List[str]) -> Dict[str, int]:
+        """请求单个批次 (≤500 ID) 的引用数"""
         # 构造请求体，Semantic Scholar 支持 ARXIV:前缀
-        paper_ids = [f"ARXIV:{p.arxiv_id}" for p in papers]
-        
-        citations_map = {}
-        
+        paper_ids = [f"ARXIV:{aid}" for aid in arxiv_ids]
+
         try:
-            # 批量请求，如果数量很大应该分批，这里假设 max_results 较小 (<100)
-            req = urllib.request.Request(
+            raw = _cached_urlopen(
                 f"{self.SEMANTIC_SCHOLAR_BATCH_URL}?fields=citationCount",
-                data=json.dumps({"ids": paper_ids}).encode('utf-8'),
+                body=_json_dumps({"ids": paper_ids}),
                 headers={'Content-Type': 'application/json'}
             )
-            
-            with urllib.request.urlopen(req, timeout=15) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                
+            data = _json_loads(raw)
+
             # Semantic Scholar 返回的顺序对应请求的顺序
             # 如果没找到，返回 null
-            for i, item in enumerate(data):
-                if item and 'citationCount' in item:
-                    # 匹配回原始 paper list 的 arxiv_id
-                    original_id = papers[i].arxiv_id
-                    citations_map[original_id] = item['citationCount']
-            
-            print(f"  成功获取 {len(citations_map)} 篇论文的引用数据")
-                    
+            return {
+                arxiv_ids[i]: item['citationCount']
+                for i, item in enumerate(data)
+                if item and 'citationCount' in item
+            }
+
         except Exception as e:
             print(f"⚠️ 获取引用数失败 (可能是 API 限制或网络问题): {e}")
-            
+            return {}
+
+    def _fetch_citation_counts_batched(self, arxiv_ids: List[str]) -> Dict[str, int]:
+        """从 Semantic Scholar 批量获取引用数 (按 500 ID 上限分批并发)"""
+        if not arxiv_ids:
+            return {}
+
+        print("🔍 正在从 Semantic Scholar 获取引用数据...")
+
+        limit = self.SEMANTIC_SCHOLAR_BATCH_LIMIT
+        chunks = [arxiv_ids[i:i + limit] for i in range(0, len(arxiv_ids), limit)]
+
+        citations_map = {}
+        with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+            for result in executor.map(self._fetch_citation_chunk, chunks):
+                citations_map.update(result)
+
+        print(f"  成功获取 {len(citations_map)} 篇论文的引用数据")
         return citations_map
 
-    def fetch_papers(self, keywords: List[str], categories: List[str] = None) -> List[ArxivPaper]:
-        """抓取论文"""
+    def _fetch_one_category(self, keyword_query: str, category: str) -> bytes:
+        """抓取单个分类的原始 XML 响应 (在工作线程中执行)"""
+        # 限制分类
+        query = f"({keyword_query}) AND cat:{category}"
+
+        params = {
+            'search_query': query,
+            'start': 0,
+            'max_results': self.max_results,
+            'sortBy': 'submittedDate',
+            'sortOrder': 'descending'
+        }
+
+        url = f"{self.BASE_URL}?{urllib.parse.urlencode(params)}"
+
+        print(f"正在获取 {category} 分类的论文...")
+        return _cached_urlopen(url)
+
+    def fetch_papers(self, keyword_query: str, categories: List[str] = None,
+                     fetch_citations: bool = True) -> List[ArxivPaper]:
+        """抓取论文 (keyword_query 为预构建的 OR 查询片段)"""
         if categories is None:
             categories = ["cs.CL", "cs.LG", "cs.AI", "cs.IR"]
-        
+
         all_papers = []
         seen_ids = set()
-        
+
         # 1. 从 Arxiv 获取论文
-        for category in categories:
-            query = self._build_query(keywords, category)
-            
-            params = {
-                'search_query': query,
-                'start': 0,
-                'max_results': self.max_results,
-                'sortBy': 'submittedDate',
-                'sortOrder': 'descending'
+        # 每个分类一次 HTTP 往返，I/O 等待期间 GIL 会释放，
+        # 并发抓取后总耗时 ≈ 最慢的一个分类而不是所有分类之和
+        with ThreadPoolExecutor(max_workers=len(categories)) as executor:
+            futures = {
+                executor.submit(self._fetch_one_category, keyword_query, category): category
+                for category in categories
             }
-            
-            url = f"{self.BASE_URL}?{urllib.parse.urlencode(params)}"
-            
-            try:
-                print(f"正在获取 {category} 分类的论文...")
-                with urllib.request.urlopen(url, timeout=30) as response:
-                    data = response.read().decode('utf-8')
-                
-                # 解析 XML
-                root = ET.fromstring(data)
-                ns = {'atom': 'http://www.w3.org/2005/Atom'}
-                
-                for entry in root.findall('atom:entry', ns):
-                    paper = self._parse_entry(entry, ns)
-                    if paper.arxiv_id not in seen_ids:
-                        all_papers.append(paper)
-                        seen_ids.add(paper.arxiv_id)
-                
-            except Exception as e:
-                print(f"获取 {category} 分类论文时出错: {e}")
-                continue
-        
+
+            for future in as_completed(futures):
+                category = futures[future]
+                try:
+                    # lxml 偏好 bytes 输入，直接传原始响应，省掉一次 decode
+                    data = future.result()
+
+                    # 解析 XML (保持在主线程)
+                    # iterparse 流式消费，每个 entry 解析完即 clear()，
+                    # 峰值内存为单个 entry 而不是整棵 DOM
+                    for _, elem in ET.iterparse(BytesIO(data), events=('end',)):
+                        if elem.tag != _ENTRY:
+                            continue
+                        paper = self._parse_entry(elem)
+                        if paper.arxiv_id not in seen_ids:
+                            all_papers.append(paper)
+                            seen_ids.add(paper.arxiv_id)
+                        elem.clear()
+
+                except Exception as e:
+                    print(f"获取 {category} 分类论文时出错: {e}")
+                    continue
+
         # 2. 获取引用数并排序
-        if all_papers:
-            citations = self._fetch_citation_counts(all_papers)
-            for paper in all_papers:
-                paper.citation_count = citations.get(paper.arxiv_id, 0)
-            
-            # 3. 按引用数降序排序
-            # 如果引用数相同，保持原有顺序（通常是时间顺序）
-            all_papers.sort(key=lambda x: x.citation_count, reverse=True)
-            
+        # fetch_all 会跨领域合并后统一批量请求，此时以 fetch_citations=False 跳过
+        if all_papers and fetch_citations:
+            citations = self._fetch_citation_counts_batched(
+                [p.arxiv_id for p in all_papers]
+            )
+            self._apply_citations_and_sort(all_papers, citations)
+
         return all_papers
-    
-    def fetch_llm_papers(self) -> List[ArxivPaper]:
+
+    @staticmethod
+    def _apply_citations_and_sort(papers: List[ArxivPaper], citations: Dict[str, int]):
+        """回填引用数并按引用数降序排序 (引用数相同保持原有时间顺序)"""
+        for paper in papers:
+            paper.citation_count = citations.get(paper.arxiv_id, 0)
+        papers.sort(key=lambda x: x.citation_count, reverse=True)
+
+    def fetch_llm_papers(self, fetch_citations: bool = True) -> List[ArxivPaper]:
         """获取大模型相关论文"""
         print("=" * 50)
         print("📚 正在获取大模型领域论文...")
         print("=" * 50)
-        return self.fetch_papers(self.LLM_KEYWORDS, ["cs.CL", "cs.LG", "cs.AI"])
-    
-    def fetch_ad_papers(self) -> List[ArxivPaper]:
+        return self.fetch_papers(self._llm_kw_query, ["cs.CL", "cs.LG", "cs.AI"],
+                                 fetch_citations=fetch_citations)
+
+    def fetch_ad_papers(self, fetch_citations: bool = True) -> List[ArxivPaper]:
         """获取广告领域论文"""
         print("=" * 50)
         print("📊 正在获取广告领域论文...")
         print("=" * 50)
-        return self.fetch_papers(self.AD_KEYWORDS, ["cs.IR", "cs.LG", "cs.AI"])
-    
+        return self.fetch_papers(self._ad_kw_query, ["cs.IR", "cs.LG", "cs.AI"],
+                                 fetch_citations=fetch_citations)
+
     def fetch_all(self) -> dict:
-        """获取所有领域论文"""
-        return {
-            'llm': self.fetch_llm_papers(),
-            'advertising': self.fetch_ad_papers()
-        }
+        """获取所有领域论文 (并发抓取，引用数跨领域合并后一次批量请求)"""
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            llm_future = executor.submit(self.fetch_llm_papers, False)
+            ad_future = executor.submit(self.fetch_ad_papers, False)
+            papers = {
+                'llm': llm_future.result(),
+                'advertising': ad_future.result()
+            }
+
+        # 两个领域的 ID 合并去重后统一请求 Semantic Scholar
+        all_ids = sorted({p.arxiv_id for plist in papers.values() for p in plist})
+        citations = self._fetch_citation_counts_batched(all_ids)
+        for plist in papers.values():
+            self._apply_citations_and_sort(plist, citations)
+
+        return papers
+
+
+@lru_cache(maxsize=1024)
+def _parse_pub_date(day_str: str) -> date:
+    """把 'YYYY-MM-DD' 解析为 date，按字符串记忆化
+
+    同一天发布的论文共享同一个日期前缀，缓存后每个独立日期只解析一次。
+    """
+    return date.fromisoformat(day_str)
 
 
 def filter_recent_papers(papers: List[ArxivPaper], days: int = 7) -> List[ArxivPaper]:
     """过滤最近几天的论文"""
-    cutoff_date = datetime.now() - timedelta(days=days)
+    cutoff_date = (datetime.now() - timedelta(days=days)).date()
     recent_papers = []
-    
+
     for paper in papers:
         try:
             # arXiv 日期格式: 2024-01-15T12:00:00Z
-            pub_date = datetime.strptime(paper.published[:10], '%Y-%m-%d')
+            # fromisoformat 是 C 实现，比 strptime 快一个量级
+            pub_date = _parse_pub_date(paper.published[:10])
             if pub_date >= cutoff_date:
                 recent_papers.append(paper)
-        except:
+        except ValueError:
+            # 日期格式异常的论文保留，宁可多推不可漏推
             recent_papers.append(paper)
-    
+
     return recent_papers
 
 
@@ -9,6 +9,7 @@ import os
 import re
 import random
 import smtplib
+import string
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from email.header import Header
@@ -16,13 +17,125 @@ from pathlib import Path
 from datetime import datetime
 import json
 
+# 模块加载时编译一次，分类循环里不再重复查找/解析 pattern
+# 注意用 (?:...) 分组做多选一：原先的 [大豆油|油|...] 是字符类，语义不对
+_OIL_RE = re.compile(r'(\d+)g?\s*(?:大豆油|食用油|花生油|油)')
+_SALT_RE = re.compile(r'(\d+)g?\s*盐')
+
+# 健康关键词合成一个交替式，对内容做单次扫描
+# 替代 any(kw in content ...) 的 7 次全文子串扫描
+_HEALTHY_KEYWORDS = ['清炒', '清蒸', '水煮', '汆烫', '浇汁', '凉拌', '白切']
+_HEALTHY_RE = re.compile('|'.join(map(re.escape, _HEALTHY_KEYWORDS)))
+
+# 邮件 HTML 头/尾模板在模块加载时解析一次，
+# 每次调用只 substitute 动态字段，不再重建整段 f-string
+_HTML_HEADER = string.Template('''
+        <html>
+        <head>
+            <meta charset="UTF-8">
+            <style>
+                body {
+                    font-family: "Microsoft YaHei", Arial, sans-serif;
+                    line-height: 1.6;
+                    color: #333;
+                    max-width: 800px;
+                    margin: 0 auto;
+                    padding: 20px;
+                }
+                h1 {
+                    color: #2c3e50;
+                    border-bottom: 3px solid #3498db;
+                    padding-bottom: 10px;
+                }
+                h2 {
+                    color: #34495e;
+                    margin-top: 25px;
+                }
+                ul {
+                    list-style-type: none;
+                    padding-left: 0;
+                }
+                li {
+                    padding: 5px 0;
+                    padding-left: 20px;
+                }
+                li:before {
+                    content: "▸ ";
+                    color: #3498db;
+                    font-weight: bold;
+                }
+                .category {
+                    display: inline-block;
+                    background: #3498db;
+                    color: white;
+                    padding: 5px 15px;
+                    border-radius: 20px;
+                    font-size: 14px;
+                    margin-bottom: 15px;
+                }
+                .footer {
+                    margin-top: 40px;
+                    padding-top: 20px;
+                    border-top: 1px solid #eee;
+                    color: #7f8c8d;
+                    font-size: 14px;
+                }
+                img {
+                    max-width: 100%;
+                    height: auto;
+                    border-radius: 8px;
+                    margin: 20px 0;
+                }
+            </style>
+        </head>
+        <body>
+            <div class="category">$category</div>
+        ''')
+
+_HTML_FOOTER = string.Template('''
+            <div class="footer">
+                <p>📅 $date | 像老乡鸡那样做饭</p>
+                <p>💡 低油低盐，健康生活从每一餐开始 From Zhe Hu</p>
+            </div>
+        </body>
+        </html>
+        ''')
+
 
 class RecipeSender:
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent / "cookReminder"
         self.low_oil_categories = ['蒸菜', '烫菜', '汤', '凉拌', '早餐']
         self.prefer_dishes = []  # 优先推荐的清淡菜品
-        
+
+        # 分类结果缓存：菜谱库很少变化，(mtime, size) 没变就不用重新扫描
+        self._class_cache_path = Path(__file__).parent.parent / "archives" / "recipe_classification.json"
+        self._class_cache = self._load_classification_cache()
+        self._class_cache_dirty = False
+
+        # 复用的 SMTP 连接 (多封邮件共享一次 TLS 握手 + 登录)
+        self._smtp = None
+
+    def _load_classification_cache(self):
+        """加载持久化的分类缓存"""
+        try:
+            with open(self._class_cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_classification_cache(self):
+        """保存分类缓存 (仅在有新条目时写盘)"""
+        if not self._class_cache_dirty:
+            return
+        try:
+            self._class_cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self._class_cache_path, 'w', encoding='utf-8') as f:
+                json.dump(self._class_cache, f, ensure_ascii=False)
+            self._class_cache_dirty = False
+        except OSError as e:
+            print(f"保存分类缓存失败: {e}")
+
     def get_all_recipes(self):
         """获取所有菜品文件"""
         recipes = []
@@ -30,60 +143,85 @@ class RecipeSender:
         
         for category in categories:
             category_path = self.base_dir / category
-            if category_path.exists():
-                for recipe_file in category_path.glob('*.md'):
-                    if recipe_file.name != 'README.md':
+            if not category_path.exists():
+                continue
+            # os.scandir 一次 readdir 拿到目录项和类型信息，
+            # 比 Path.glob 的逐项 fnmatch+stat 便宜；路径保持 str
+            with os.scandir(category_path) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith('.md') and entry.name != 'README.md':
                         recipes.append({
-                            'file': recipe_file,
+                            'file': entry.path,
                             'category': category,
-                            'name': recipe_file.stem
+                            'name': entry.name[:-3]
                         })
-        
+
         return recipes
     
-    def is_low_oil_salt(self, recipe_path):
-        """判断是否为低油低盐菜品"""
-        try:
-            with open(recipe_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            # 检查油的用量（克数）
-            oil_pattern = r'(\d+)g?\s*[大豆油|油|食用油|花生油]'
-            oil_matches = re.findall(oil_pattern, content)
-            
-            # 检查盐的用量（克数）
-            salt_pattern = r'(\d+)g?\s*盐'
-            salt_matches = re.findall(salt_pattern, content)
-            
-            # 计算油盐用量
-            total_oil = sum([int(m) for m in oil_matches]) if oil_matches else 0
-            total_salt = sum([int(m) for m in salt_matches]) if salt_matches else 0
-            
-            # 低油：每份用油少于50g，低盐：每份用盐少于10g
-            # 或者没有明确标注油盐的（可能是清蒸、水煮类）
-            is_low_oil = total_oil < 50 or total_oil == 0
-            is_low_salt = total_salt < 10 or total_salt == 0
-            
-            # 额外检查：包含"清炒"、"清蒸"、"水煮"等关键词
-            healthy_keywords = ['清炒', '清蒸', '水煮', '汆烫', '浇汁', '凉拌', '白切']
-            has_healthy_keyword = any(keyword in content for keyword in healthy_keywords)
-            
-            return (is_low_oil and is_low_salt) or has_healthy_keyword
-            
-        except Exception as e:
-            print(f"分析菜品 {recipe_path} 时出错: {e}")
-            return False
-    
+    def is_low_oil_salt(self, content):
+        """判断是否为低油低盐菜品 (content 为已读入的菜谱文本)"""
+        # 先做便宜的检查：命中"清炒"、"清蒸"、"水煮"等关键词即可判定，
+        # 跳过后面两次捕获组扫描 (大部分健康菜谱走这条早退路径)
+        if _HEALTHY_RE.search(content) is not None:
+            return True
+
+        # 检查油的用量（克数）
+        oil_matches = _OIL_RE.findall(content)
+
+        # 检查盐的用量（克数）
+        salt_matches = _SALT_RE.findall(content)
+
+        # 计算油盐用量 (阈值是全文累计值，必须扫完才能下结论)
+        total_oil = sum([int(m) for m in oil_matches]) if oil_matches else 0
+        total_salt = sum([int(m) for m in salt_matches]) if salt_matches else 0
+
+        # 低油：每份用油少于50g，低盐：每份用盐少于10g
+        # 或者没有明确标注油盐的（可能是清蒸、水煮类）
+        is_low_oil = total_oil < 50 or total_oil == 0
+        is_low_salt = total_salt < 10 or total_salt == 0
+
+        return is_low_oil and is_low_salt
+
     def select_recipe(self):
         """选择一个低油低盐的菜品"""
         all_recipes = self.get_all_recipes()
-        
+
         # 筛选低油低盐菜品
+        # 读入的内容挂在 recipe 上，后面格式化邮件时直接复用，不再重读文件
+        # 文件 (mtime, size) 未变时直接取缓存结论，连读文件都省掉
         healthy_recipes = []
         for recipe in all_recipes:
-            if self.is_low_oil_salt(recipe['file']):
+            path = recipe['file']
+            try:
+                stat = os.stat(path)
+            except OSError as e:
+                print(f"分析菜品 {path} 时出错: {e}")
+                continue
+
+            cached = self._class_cache.get(path)
+            if cached and cached.get('mtime') == stat.st_mtime and cached.get('size') == stat.st_size:
+                healthy = cached['healthy']
+            else:
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        content = f.read()
+                except Exception as e:
+                    print(f"分析菜品 {path} 时出错: {e}")
+                    continue
+                recipe['content'] = content
+                healthy = self.is_low_oil_salt(content)
+                self._class_cache[path] = {
+                    'mtime': stat.st_mtime,
+                    'size': stat.st_size,
+                    'healthy': healthy
+                }
+                self._class_cache_dirty = True
+
+            if healthy:
                 healthy_recipes.append(recipe)
-        
+
+        self._save_classification_cache()
+
         if not healthy_recipes:
             print("未找到符合条件的低油低盐菜品")
             return None
@@ -106,7 +244,10 @@ class RecipeSender:
     
     def format_email_content(self, recipe):
         """格式化邮件内容"""
-        content = self.read_recipe_content(recipe['file'])
+        # 分类阶段已经读过文件，优先用缓存的内容
+        content = recipe.get('content')
+        if content is None:
+            content = self.read_recipe_content(recipe['file'])
         if not content:
             return None
         
@@ -115,175 +256,129 @@ class RecipeSender:
         
         return html_content
     
-    def markdown_to_html(self, markdown_content, recipe):
-        """将Markdown转换为HTML邮件格式"""
-        # 简单的markdown转HTML
-        lines = markdown_content.split('\n')
-        html_lines = []
-        
-        html_lines.append(f'''
-        <html>
-        <head>
-            <meta charset="UTF-8">
-            <style>
-                body {{
-                    font-family: "Microsoft YaHei", Arial, sans-serif;
-                    line-height: 1.6;
-                    color: #333;
-                    max-width: 800px;
-                    margin: 0 auto;
-                    padding: 20px;
-                }}
-                h1 {{
-                    color: #2c3e50;
-                    border-bottom: 3px solid #3498db;
-                    padding-bottom: 10px;
-                }}
-                h2 {{
-                    color: #34495e;
-                    margin-top: 25px;
-                }}
-                ul {{
-                    list-style-type: none;
-                    padding-left: 0;
-                }}
-                li {{
-                    padding: 5px 0;
-                    padding-left: 20px;
-                }}
-                li:before {{
-                    content: "▸ ";
-                    color: #3498db;
-                    font-weight: bold;
-                }}
-                .category {{
-                    display: inline-block;
-                    background: #3498db;
-                    color: white;
-                    padding: 5px 15px;
-                    border-radius: 20px;
-                    font-size: 14px;
-                    margin-bottom: 15px;
-                }}
-                .footer {{
-                    margin-top: 40px;
-                    padding-top: 20px;
-                    border-top: 1px solid #eee;
-                    color: #7f8c8d;
-                    font-size: 14px;
-                }}
-                img {{
-                    max-width: 100%;
-                    height: auto;
-                    border-radius: 8px;
-                    margin: 20px 0;
-                }}
-            </style>
-        </head>
-        <body>
-            <div class="category">{recipe['category']}</div>
-        ''')
-        
+    @staticmethod
+    def _convert_lines(markdown_content):
+        """逐行转换 markdown 正文，按需生成 HTML 片段"""
         in_list = False
-        for line in lines:
+        for line in markdown_content.split('\n'):
             line = line.strip()
-            
+
             # 标题
             if line.startswith('# '):
-                html_lines.append(f'<h1>{line[2:]}</h1>')
+                yield f'<h1>{line[2:]}</h1>'
             elif line.startswith('## '):
                 if in_list:
-                    html_lines.append('</ul>')
+                    yield '</ul>'
                     in_list = False
-                html_lines.append(f'<h2>{line[3:]}</h2>')
+                yield f'<h2>{line[3:]}</h2>'
             # 列表项
             elif line.startswith('- '):
                 if not in_list:
-                    html_lines.append('<ul>')
+                    yield '<ul>'
                     in_list = True
-                html_lines.append(f'<li>{line[2:]}</li>')
+                yield f'<li>{line[2:]}</li>'
             # 图片（跳过，邮件中不易显示本地图片）
             elif line.startswith('!['):
                 continue
             # 普通段落
             elif line:
                 if in_list:
-                    html_lines.append('</ul>')
+                    yield '</ul>'
                     in_list = False
-                html_lines.append(f'<p>{line}</p>')
-        
+                yield f'<p>{line}</p>'
+
         if in_list:
-            html_lines.append('</ul>')
-        
-        # 添加页脚
+            yield '</ul>'
+
+    def markdown_to_html(self, markdown_content, recipe):
+        """将Markdown转换为HTML邮件格式"""
+        # 简单的markdown转HTML：头/尾各一段，正文由生成器产出后一次 join
+        header = _HTML_HEADER.substitute(category=recipe['category'])
         today = datetime.now().strftime('%Y年%m月%d日')
-        html_lines.append(f'''
-            <div class="footer">
-                <p>📅 {today} | 像老乡鸡那样做饭</p>
-                <p>💡 低油低盐，健康生活从每一餐开始 From Zhe Hu</p>
-            </div>
-        </body>
-        </html>
-        ''')
-        
-        return '\n'.join(html_lines)
+        footer = _HTML_FOOTER.substitute(date=today)
+        return '\n'.join([header, *self._convert_lines(markdown_content), footer])
     
-    def send_email(self, to_email, subject, content):
-        """发送邮件"""
-        # 从环境变量读取邮件配置
+    def _connect(self):
+        """建立并登录一个新的 SMTP 连接"""
         smtp_server = os.getenv('SMTP_SERVER', 'smtp.qq.com')
         smtp_port = int(os.getenv('SMTP_PORT', '465'))  # 默认使用SSL端口465
         from_email = os.getenv('FROM_EMAIL')
         email_password = os.getenv('EMAIL_PASSWORD')
-        
+
         if not from_email or not email_password:
             print("错误: 未设置邮件配置环境变量 FROM_EMAIL 和 EMAIL_PASSWORD")
-            return False
-        
+            return None
+
+        print(f"正在连接邮件服务器 {smtp_server}:{smtp_port}...")
+        print(f"发件邮箱: {from_email}")
+        print(f"授权码长度: {len(email_password)} 字符")
+
+        if smtp_port == 465:
+            # 使用SSL连接（推荐用于QQ邮箱）
+            import ssl
+            context = ssl.create_default_context()
+            server = smtplib.SMTP_SSL(smtp_server, smtp_port, context=context)
+        else:
+            # 使用TLS连接（端口587）
+            server = smtplib.SMTP(smtp_server, smtp_port)
+            server.starttls()
+
+        # 开启调试模式
+        server.set_debuglevel(1)
+
+        print("正在登录邮箱...")
+        print(f"尝试登录: {from_email}")
+        server.login(from_email, email_password)
+        print("✓ 登录成功！")
+        return server
+
+    def _get_server(self):
+        """复用已登录的连接；连接失效时自动重连"""
+        if self._smtp is not None:
+            try:
+                self._smtp.noop()
+                return self._smtp
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPException):
+                self._smtp = None
+        self._smtp = self._connect()
+        return self._smtp
+
+    def close(self):
+        """关闭 SMTP 连接"""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except Exception:
+                pass
+            self._smtp = None
+
+    def send_email(self, to_email, subject, content):
+        """发送邮件 (复用连接，连续多封只握手/登录一次)"""
+        from_email = os.getenv('FROM_EMAIL')
+
         try:
+            server = self._get_server()
+            if server is None:
+                return False
+
             # 创建邮件
             message = MIMEMultipart('alternative')
             # QQ邮箱要求From字段必须是纯邮箱地址，不能包含显示名称
             message['From'] = from_email
             message['To'] = to_email
             message['Subject'] = Header(subject, 'utf-8')
-            
+
             # 添加HTML内容
             html_part = MIMEText(content, 'html', 'utf-8')
             message.attach(html_part)
-            
-            # 发送邮件 - 根据端口选择连接方式
-            print(f"正在连接邮件服务器 {smtp_server}:{smtp_port}...")
-            print(f"发件邮箱: {from_email}")
-            print(f"授权码长度: {len(email_password)} 字符")
-            
-            if smtp_port == 465:
-                # 使用SSL连接（推荐用于QQ邮箱）
-                import ssl
-                context = ssl.create_default_context()
-                server = smtplib.SMTP_SSL(smtp_server, smtp_port, context=context)
-            else:
-                # 使用TLS连接（端口587）
-                server = smtplib.SMTP(smtp_server, smtp_port)
-                server.starttls()
-            
-            # 开启调试模式
-            server.set_debuglevel(1)
-            
-            print("正在登录邮箱...")
-            print(f"尝试登录: {from_email}")
-            server.login(from_email, email_password)
-            print("✓ 登录成功！")
-            
+
             print("正在发送邮件...")
             server.sendmail(from_email, [to_email], message.as_string())
             print("✓ 邮件发送成功！")
-            
-            server.quit()
-            
+
             print(f"✅ 邮件已成功发送到 {to_email}")
             return True
-            
+
         except Exception as e:
             print(f"❌ 发送邮件失败: {e}")
             import traceback
@@ -311,7 +406,8 @@ class RecipeSender:
         subject = f"🍽️ 今日推荐菜品：{recipe['name']} ({today})"
         
         success = self.send_email(to_email, subject, content)
-        
+        self.close()
+
         print("=" * 50)
         return success
 
@@ -4,57 +4,123 @@
 去重模块 - 跟踪已展示过的内容，避免重复推送
 """
 
+import gzip
 import os
 import json
 from datetime import datetime
 from typing import Set, Dict
 
+try:
+    # orjson 是 C 扩展，读写去重记录比 stdlib json 快数倍
+    import orjson
+except ImportError:
+    orjson = None
+
 
 class Deduplicator:
     """内容去重器"""
     
     def __init__(self, storage_path: str = None):
         if storage_path is None:
-            # 默认存储在 archives/seen_items.json
+            # 默认存储在 archives/seen_items.json.gz（紧凑 + gzip，
+            # 比旧的 indent=2 明文小一个数量级）
             base_dir = os.path.dirname(os.path.dirname(__file__))
-            self.storage_path = os.path.join(base_dir, 'archives', 'seen_items.json')
+            self.storage_path = os.path.join(base_dir, 'archives', 'seen_items.json.gz')
         else:
             self.storage_path = storage_path
-        
+
+        # 首次升级时从旧的未压缩 seen_items.json 迁移
+        self._legacy_path = self.storage_path[:-3] if self.storage_path.endswith('.gz') else None
+
+
+        # 追加日志：mark_seen 逐行追加，save 只在日志变大后才合并回快照，
+        # 把每次运行的写入量从 O(全量) 降到 O(新增)
+        self._log_path = self.storage_path + '.log'
         self.seen_items: Dict[str, Set[str]] = {}
         self.load()
-    
+        self._log = open(self._log_path, 'a', encoding='utf-8', buffering=1)
+
     def load(self):
-        """从文件加载已见内容"""
-        if os.path.exists(self.storage_path):
+        """从文件加载已见内容（快照 + 回放追加日志）"""
+        raw = None
+        try:
+            if os.path.exists(self.storage_path):
+                with gzip.open(self.storage_path, 'rb') as f:
+                    raw = f.read()
+            elif self._legacy_path and os.path.exists(self._legacy_path):
+                # 一次性迁移：读旧的未压缩文件，下次合并即写成 .gz
+                with open(self._legacy_path, 'rb') as f:
+                    raw = f.read()
+        except Exception as e:
+            print(f"⚠️ 加载去重记录失败: {e}")
+
+        if raw:
             try:
-                with open(self.storage_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # JSON 不支持 Set，转换回来
-                    self.seen_items = {k: set(v) for k, v in data.items()}
-                print(f"📂 已加载 {sum(len(v) for v in self.seen_items.values())} 条历史记录")
+                if orjson is not None:
+                    data = orjson.loads(raw)
+                else:
+                    data = json.loads(raw)
+                # JSON 不支持 Set，转换回来
+                self.seen_items = {k: set(v) for k, v in data.items()}
             except Exception as e:
-                print(f"⚠️ 加载去重记录失败: {e}")
+                print(f"⚠️ 解析去重记录失败: {e}")
                 self.seen_items = {}
         else:
             self.seen_items = {}
+
+        # 回放上次合并后追加的记录（tab 分隔，逐行解析远比全量 JSON 便宜）
+        if os.path.exists(self._log_path):
+            try:
+                with open(self._log_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        content_type, _, unique_id = line.rstrip('\n').partition('\t')
+                        if unique_id:
+                            self.seen_items.setdefault(content_type, set()).add(unique_id)
+            except Exception as e:
+                print(f"⚠️ 回放去重日志失败: {e}")
+
+        total = sum(len(v) for v in self.seen_items.values())
+        if total:
+            print(f"📂 已加载 {total} 条历史记录")
+        else:
             print("📂 初始化新的去重记录")
     
     def save(self):
-        """保存已见内容到文件"""
+        """按需合并：新条目已随 mark_seen 落盘到日志，日志变大才重写快照"""
+        try:
+            log_size = os.path.getsize(self._log_path) if os.path.exists(self._log_path) else 0
+            snap_size = os.path.getsize(self.storage_path) if os.path.exists(self.storage_path) else 0
+            if snap_size and log_size <= 2 * snap_size:
+                print(f"💾 去重记录已随日志落盘（日志 {log_size}B，暂不合并）")
+                return
+            self._compact()
+        except Exception as e:
+            print(f"❌ 保存去重记录失败: {e}")
+
+    def _compact(self):
+        """把内存中的全量记录重写为快照，并清空追加日志"""
         try:
             # 确保目录存在
             os.makedirs(os.path.dirname(self.storage_path), exist_ok=True)
-            
+
             # Set 转换为 List 以便 JSON 序列化
             data = {k: list(v) for k, v in self.seen_items.items()}
-            
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            
-            print(f"💾 已保存 {sum(len(v) for v in self.seen_items.values())} 条去重记录")
+
+            # 紧凑序列化（没有人肉眼看这个文件，不做 pretty-print）再 gzip
+            if orjson is not None:
+                # orjson 直接产出 bytes，免去中间 str 的编码开销
+                payload = orjson.dumps(data)
+            else:
+                payload = json.dumps(data, ensure_ascii=False).encode('utf-8')
+            with gzip.open(self.storage_path, 'wb') as f:
+                f.write(payload)
+
+            # 快照已包含全部记录，日志可以清空重来
+            open(self._log_path, 'w').close()
+
+            print(f"💾 已合并 {sum(len(v) for v in self.seen_items.values())} 条去重记录")
         except Exception as e:
-            print(f"❌ 保存去重记录失败: {e}")
+            print(f"❌ 合并去重记录失败: {e}")
     
     def is_seen(self, content_type: str, unique_id: str) -> bool:
         """检查内容是否已展示过"""
@@ -63,10 +129,11 @@ class Deduplicator:
         return unique_id in self.seen_items[content_type]
     
     def mark_seen(self, content_type: str, unique_id: str):
-        """标记内容为已展示"""
-        if content_type not in self.seen_items:
-            self.seen_items[content_type] = set()
-        self.seen_items[content_type].add(unique_id)
+        """标记内容为已展示（新条目同步追加到日志）"""
+        bucket = self.seen_items.setdefault(content_type, set())
+        if unique_id not in bucket:
+            bucket.add(unique_id)
+            self._log.write(f"{content_type}\t{unique_id}\n")
     
     def filter_new(self, content_type: str, items: list, id_getter) -> list:
         """
@@ -80,13 +147,23 @@ class Deduplicator:
         Returns:
             仅包含新内容的列表
         """
+        seen = self.seen_items.setdefault(content_type, set())
+        ids = [id_getter(item) for item in items]
+
+        # 集合差一次算出新 id，单次 |= 替代逐条 is_seen + mark_seen
+        new_ids = set(ids) - seen
+        seen |= new_ids
+        for unique_id in new_ids:
+            self._log.write(f"{content_type}\t{unique_id}\n")
+
+        # 同批内重复的 id 只保留第一条（与逐条判重时的行为一致）
+        remaining = set(new_ids)
         new_items = []
-        for item in items:
-            unique_id = id_getter(item)
-            if not self.is_seen(content_type, unique_id):
+        for item, unique_id in zip(items, ids):
+            if unique_id in remaining:
+                remaining.discard(unique_id)
                 new_items.append(item)
-                self.mark_seen(content_type, unique_id)
-        
+
         filtered_count = len(items) - len(new_items)
         if filtered_count > 0:
             print(f"  🔄 {content_type}: 过滤掉 {filtered_count} 条重复内容，保留 {len(new_items)} 条新内容")
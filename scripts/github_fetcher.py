@@ -4,14 +4,32 @@
 GitHub 数据抓取模块 - 获取 Issues 和 Trending 项目
 """
 
-import urllib.request
+import os
+import sys
 import urllib.parse
 import json
 import re
+import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from typing import List, Optional, Dict
 
+try:
+    # orjson 解析 GitHub API 的 JSON 响应比 stdlib 快数倍
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# 基础请求头在模块加载时构建一次，所有实例共享同一份常量，
+# __init__ 只做一次浅拷贝再补上 auth
+_BASE_HEADERS = {
+    'Accept': 'application/vnd.github.v3+json',
+    'Accept-Encoding': 'gzip',
+    'User-Agent': 'DailyReminder-Bot'
+}
+
 
 @dataclass
 class GitHubIssue:
@@ -75,22 +93,83 @@ class GitHubFetcher:
     
     def __init__(self, token: Optional[str] = None):
         self.token = token or os.getenv('GITHUB_TOKEN')
-        self.headers = {
-            'Accept': 'application/vnd.github.v3+json',
-            'User-Agent': 'DailyReminder-Bot'
-        }
+        self.headers = dict(_BASE_HEADERS)
         if self.token:
             self.headers['Authorization'] = f'token {self.token}'
-    
-    def _make_request(self, url: str) -> dict:
-        """发送 API 请求"""
-        req = urllib.request.Request(url, headers=self.headers)
+        # 复用同一个 Session：对 api.github.com 的多次请求共享 TCP+TLS
+        # 连接，省掉每次请求的握手开销（Session 线程安全，可被线程池共用）
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        # ETag 条件请求缓存：内容未变时 GitHub 返回 304（空响应体，
+        # 且不计入 rate limit），直接复用上次的结果
+        base_dir = os.path.dirname(os.path.dirname(__file__))
+        self._etag_path = os.path.join(base_dir, 'archives', 'github_etags.json')
+        self._etag_cache = self._load_etag_cache()
+        # 本次运行实际请求过的 key；落盘时据此裁剪，不再关注的仓库/
+        # 查询的旧条目随之淘汰，缓存文件不会无限增长
+        self._etag_keys_used = set()
+
+    def _load_etag_cache(self) -> dict:
         try:
-            with urllib.request.urlopen(req, timeout=15) as response:
-                return json.loads(response.read().decode('utf-8'))
-        except urllib.error.HTTPError as e:
-            print(f"GitHub API 错误: {e.code}")
+            with open(self._etag_path, 'rb') as f:
+                if orjson is not None:
+                    return orjson.loads(f.read())
+                return json.load(f)
+        except (OSError, ValueError):
             return {}
+
+    def _save_etag_cache(self):
+        """批量抓取完成后在主线程调用一次，只保留本次运行用到的 key
+
+        _make_request 在线程池里并发跑，这里不能逐响应写盘：多线程
+        truncate 同一个文件会互相踩踏。改为批量结束后快照字典、写临时
+        文件再 os.replace 原子替换（与其他缓存写入方的模式一致）。
+        """
+        entries = {k: self._etag_cache[k]
+                   for k in self._etag_keys_used if k in self._etag_cache}
+        try:
+            os.makedirs(os.path.dirname(self._etag_path), exist_ok=True)
+            tmp_path = f'{self._etag_path}.{os.getpid()}.tmp'
+            if orjson is not None:
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps(entries))
+            else:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self._etag_path)  # 原子替换
+        except OSError as e:
+            print(f"⚠️ 写入 ETag 缓存失败: {e}")
+
+    def _make_request(self, url: str, cache_key: Optional[str] = None) -> dict:
+        """发送 API 请求（带 If-None-Match 条件头）
+
+        Args:
+            cache_key: ETag 缓存键。带秒级时间戳参数的 URL 每次运行都
+                不同，直接拿 URL 做键永远命不中；调用方传入按仓库/查询
+                归一化的稳定键，内容没变时服务端照样回 304。
+        """
+        key = cache_key or url
+        self._etag_keys_used.add(key)
+        cached = self._etag_cache.get(key)
+        headers = {'If-None-Match': cached['etag']} if cached else {}
+        try:
+            response = self._session.get(url, timeout=15, headers=headers)
+            if response.status_code == 304:
+                print(f"  💾 304 Not Modified，复用缓存响应")
+                return cached.get('data', {})
+            if response.status_code >= 400:
+                print(f"GitHub API 错误: {response.status_code}")
+                return {}
+            if orjson is not None:
+                data = orjson.loads(response.content)
+            else:
+                data = response.json()
+            etag = response.headers.get('ETag')
+            if etag:
+                # 只更新内存字典（键不冲突，GIL 下安全）；
+                # 落盘统一放在批量抓取之后
+                self._etag_cache[key] = {'etag': etag, 'data': data}
+            return data
         except Exception as e:
             print(f"请求失败: {e}")
             return {}
@@ -115,11 +194,12 @@ class GitHubFetcher:
             'since': since
         }
         url = f"{url}?{urllib.parse.urlencode(params)}"
-        
-        data = self._make_request(url)
+
+        # 按仓库做缓存键：URL 里的 since 时间戳每次运行都不同
+        data = self._make_request(url, cache_key=f'issues:{repo}')
         if not data:
             return []
-        
+
         issues = []
         for item in data:
             # 跳过 PR (在 issues API 中会包含 PR)
@@ -129,25 +209,32 @@ class GitHubFetcher:
             issue = GitHubIssue(
                 title=item.get('title', ''),
                 url=item.get('html_url', ''),
-                repo_name=repo.split('/')[-1],
+                repo_name=sys.intern(repo.split('/')[-1]),
                 issue_number=item.get('number', 0),
                 comments_count=item.get('comments', 0),
                 created_at=item.get('created_at', ''),
                 author=item.get('user', {}).get('login', 'unknown'),
-                labels=[l.get('name', '') for l in item.get('labels', [])]
+                # 标签名在仓库内高度重复（bug / enhancement ...），intern
+                # 后同名标签共享一个 str 对象
+                labels=[sys.intern(l.get('name', '')) for l in item.get('labels', [])]
             )
             issues.append(issue)
         
         return issues
     
     def fetch_all_issues(self, max_per_repo: int = 5) -> List[GitHubIssue]:
-        """获取所有目标仓库的 Issues"""
+        """获取所有目标仓库的 Issues (各仓库并发请求)"""
         all_issues = []
-        for repo in self.TARGET_REPOS:
-            print(f"  📂 获取 {repo} 的 Issues...")
-            issues = self.fetch_issues(repo, max_results=max_per_repo)
-            all_issues.extend(issues)
-            print(f"     找到 {len(issues)} 条")
+        # 每个仓库一次 HTTPS 往返，并发后总耗时 ≈ 单次 RTT
+        with ThreadPoolExecutor(max_workers=len(self.TARGET_REPOS)) as executor:
+            results = executor.map(
+                lambda repo: self.fetch_issues(repo, max_results=max_per_repo),
+                self.TARGET_REPOS
+            )
+            for repo, issues in zip(self.TARGET_REPOS, results):
+                all_issues.extend(issues)
+                print(f"  📂 {repo}: 找到 {len(issues)} 条 Issues")
+        self._save_etag_cache()
         return all_issues
     
     def fetch_trending(self, since: str = 'daily', language: str = '', max_results: int = 10) -> List[TrendingRepo]:
@@ -162,11 +249,18 @@ class GitHubFetcher:
         url = f"https://api.gitterapp.com/repositories?since={since}"
         if language:
             url += f"&language={language}"
-        
+
         try:
-            req = urllib.request.Request(url, headers={'User-Agent': 'DailyReminder-Bot'})
-            with urllib.request.urlopen(req, timeout=15) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            # 不走 self._session：会话默认头里带着 GitHub token，
+            # 不能把它发给第三方主机
+            response = requests.get(
+                url, timeout=15,
+                headers={'User-Agent': _BASE_HEADERS['User-Agent']})
+            response.raise_for_status()
+            if orjson is not None:
+                data = orjson.loads(response.content)
+            else:
+                data = response.json()
         except Exception as e:
             print(f"获取 Trending 失败: {e}")
             # 尝试备用方案
@@ -204,8 +298,11 @@ class GitHubFetcher:
             'per_page': max_results
         }
         url = f"{url}?{urllib.parse.urlencode(params)}"
-        
-        data = self._make_request(url)
+
+        # 查询里的 created:> 日期每天都变，同样用稳定键
+        data = self._make_request(
+            url, cache_key=f'trending-search:{language or "all"}')
+        self._save_etag_cache()
         if not data or 'items' not in data:
             return []
         
@@ -225,10 +322,6 @@ class GitHubFetcher:
         return repos
 
 
-# 需要在文件开头导入 os
-import os
-
-
 if __name__ == "__main__":
     fetcher = GitHubFetcher()
     
@@ -4,14 +4,35 @@
 Hacker News 数据抓取模块 - 获取热门 AI/LLM 相关帖子
 """
 
-import urllib.request
+import functools
+import os
+import time
 import json
+import re
+import urllib.parse
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    # orjson 直接吃 bytes，解析 item JSON 比 stdlib 快数倍
+    import orjson
+except ImportError:
+    orjson = None
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from pathlib import Path
 from typing import List, Optional
 
 
-@dataclass
+# item JSON 磁盘缓存：定时任务两次运行之间热门 id 大量重复
+# （beststories 尤其换得慢），命中就完全不出网
+CACHE_DIR = Path.home() / '.cache' / 'dailyreminder' / 'hn'
+CACHE_TTL = 6 * 3600  # 秒；分数/评论数最多陈旧 6 小时
+
+
+@dataclass(slots=True, frozen=True, eq=False)
 class HNStory:
     """Hacker News 帖子数据结构"""
     id: int
@@ -22,14 +43,28 @@ class HNStory:
     score: int
     num_comments: int
     created_at: int
-    
+    # 构造时转换一次，访问时不再反复做 fromtimestamp（含时区查询）
+    created_dt: datetime = field(init=False)
+
+    def __post_init__(self):
+        # frozen dataclass 里只能绕过 __setattr__ 赋值
+        object.__setattr__(self, 'created_dt', datetime.fromtimestamp(self.created_at))
+
+    # 按 id 判同/求哈希：同一故事的两次抓取（分数可能已变）在
+    # 去重集合里视为同一条，而不是逐字段比较
+    def __eq__(self, other) -> bool:
+        return isinstance(other, HNStory) and self.id == other.id
+
+    def __hash__(self) -> int:
+        return hash(self.id)
+
     @property
     def unique_id(self) -> str:
         return str(self.id)
-    
+
     @property
     def created_datetime(self) -> datetime:
-        return datetime.fromtimestamp(self.created_at)
+        return self.created_dt
     
     def to_dict(self) -> dict:
         return {
@@ -43,6 +78,7 @@ class HNFetcher:
     """Hacker News 数据抓取器"""
     
     API_BASE = "https://hacker-news.firebaseio.com/v0"
+    ALGOLIA_BASE = "https://hn.algolia.com/api/v1"
     HN_BASE = "https://news.ycombinator.com"
     
     # AI/LLM 相关关键词 (用于过滤)
@@ -53,23 +89,142 @@ class HNFetcher:
         'fine-tun', 'rlhf', 'training', 'model', 'embedding',
         'vector', 'rag', 'agent', 'langchain', 'huggingface'
     ]
-    
+
+    # 合成单个交替式，一次 C 级扫描替代 25 次子串查找 + lower() 分配
+    # （保持与原 `kw in title.lower()` 相同的子串语义，不加词边界）
+    AI_REGEX = re.compile('|'.join(map(re.escape, AI_KEYWORDS)), re.IGNORECASE)
+
+
     def __init__(self):
-        pass
-    
+        # item JSON 在几分钟内基本不变，而 topstories 和 beststories 的
+        # id 重叠度很高；进程内给 item 抓取套一层 LRU，先抓 top 再抓
+        # best 时重叠的 id 不再重复下载。缓存绑在实例上（而不是装饰
+        # 方法），避免 lru_cache 按 self 持有实例
+        self._fetch_item = functools.lru_cache(maxsize=4096)(self._fetch_item_uncached)
+        # 单个 Session 复用 keep-alive 连接：上百个小 GET 不再
+        # 每次对 firebaseio 重做一遍 TCP+TLS 握手
+        self._session = requests.Session()
+        self._session.headers['Accept-Encoding'] = 'gzip, deflate'
+        # 连接池撑满线程池的并发度（默认 10 会在 20 并发下反复建连），
+        # 瞬时错误在传输层指数退避重试，不污染业务代码
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=2,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        ))
+
+    def _fetch_item_uncached(self, story_id: int):
+        # 先查磁盘缓存（跨进程），未命中或过期才真正请求
+        cache_file = CACHE_DIR / f'{story_id}.json'
+        try:
+            if time.time() - cache_file.stat().st_mtime < CACHE_TTL:
+                raw = cache_file.read_bytes()
+                return orjson.loads(raw) if orjson is not None else json.loads(raw)
+        except (OSError, ValueError):
+            pass  # 无缓存、已过期或内容损坏
+
+        item = self._make_request(f"{self.API_BASE}/item/{story_id}.json")
+        if item is not None:
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+                if orjson is not None:
+                    tmp_file.write_bytes(orjson.dumps(item))
+                else:
+                    tmp_file.write_text(json.dumps(item), encoding='utf-8')
+                os.replace(tmp_file, cache_file)  # 原子替换，线程池里并发写也安全
+            except OSError:
+                pass
+        return item
+
+
     def _make_request(self, url: str) -> any:
         """发送请求"""
         try:
-            with urllib.request.urlopen(url, timeout=10) as response:
-                return json.loads(response.read().decode('utf-8'))
+            response = self._session.get(url, timeout=10)
+            response.raise_for_status()
+            if orjson is not None:
+                return orjson.loads(response.content)
+            return response.json()
         except Exception as e:
             print(f"HN API 请求失败: {e}")
             return None
     
+    def _fetch_items(self, ids: List[int]) -> List[Optional[dict]]:
+        """并发抓取一批 item 详情，结果与 ids 顺序一致
+
+        逐条串行抓取时总耗时是各请求 RTT 之和；item 请求纯 I/O，
+        放进线程池后总耗时约等于最慢一条的 RTT。
+        并发上限 20，避免对 firebaseio 压力过大。
+        """
+        if not ids:
+            return []
+        with ThreadPoolExecutor(max_workers=min(20, len(ids))) as executor:
+            return list(executor.map(self._fetch_item, ids))
+
+    def _iter_items(self, ids: List[int], batch_size: int = 20):
+        """按 20 条一波并发抓取并顺序产出 item
+
+        一次性抓满 100 条会在凑够 max_results 后浪费剩余请求；
+        分波抓取让调用方提前 break 时，后面的波次根本不会发出，
+        既保住并发收益又保留早退语义。
+        """
+        for start in range(0, len(ids), batch_size):
+            yield from self._fetch_items(ids[start:start + batch_size])
+
     def _is_ai_related(self, title: str) -> bool:
         """检查标题是否与 AI/LLM 相关"""
-        title_lower = title.lower()
-        return any(kw in title_lower for kw in self.AI_KEYWORDS)
+        return self.AI_REGEX.search(title) is not None
+
+    def _fetch_via_algolia(self, min_score: int, max_results: int) -> Optional[List[HNStory]]:
+        """用 Algolia 搜索 API 在服务端完成关键词 + 分数过滤
+
+        Firebase 端点只能客户端过滤：抓上百条完整 item 再丢掉九成。
+        Algolia 的查询语法没有 OR（多词默认 AND），所以每个关键词发
+        一个小查询，线程池并发后总耗时 ≈ 一次 RTT，再按 id 合并去重、
+        按分数取前若干条 —— 二十几个搜索请求仍远少于上百个 item GET。
+        全部失败或 0 命中时返回 None 走兜底路径：空结果分不清
+        "真的没有" 和 "查询姿势不对"，宁可退回全量扫描。
+        """
+        def _search_one(keyword: str) -> Optional[dict]:
+            params = {
+                'query': keyword,
+                'tags': 'story',
+                'numericFilters': f'points>={min_score}',
+                'hitsPerPage': max_results,
+            }
+            return self._make_request(
+                f"{self.ALGOLIA_BASE}/search?{urllib.parse.urlencode(params)}")
+
+        with ThreadPoolExecutor(max_workers=min(20, len(self.AI_KEYWORDS))) as executor:
+            responses = executor.map(_search_one, self.AI_KEYWORDS)
+
+        stories_by_id = {}
+        for data in responses:
+            if not data or 'hits' not in data:
+                continue
+            for hit in data['hits']:
+                story_id = int(hit.get('objectID') or 0)
+                if not story_id or story_id in stories_by_id:
+                    continue
+                stories_by_id[story_id] = HNStory(
+                    id=story_id,
+                    title=hit.get('title') or '',
+                    url=hit.get('url') or '',
+                    hn_url=f"{self.HN_BASE}/item?id={story_id}",
+                    author=hit.get('author') or 'unknown',
+                    score=hit.get('points') or 0,
+                    num_comments=hit.get('num_comments') or 0,
+                    created_at=hit.get('created_at_i', 0)
+                )
+
+        if not stories_by_id:
+            return None
+
+        stories = sorted(stories_by_id.values(),
+                         key=lambda s: s.score, reverse=True)
+        return stories[:max_results]
     
     def fetch_top_stories(
         self, 
@@ -85,24 +240,30 @@ class HNFetcher:
             max_results: 最大返回数量
             filter_ai: 是否只获取 AI 相关内容
         """
-        # 获取 top stories IDs
+        # AI 过滤场景下优先走 Algolia：1 个搜索请求替代 ~100 个 item GET
+        if filter_ai:
+            stories = self._fetch_via_algolia(min_score, max_results)
+            if stories is not None:
+                print(f"🟠 HN: Algolia 命中 {len(stories)} 条 AI 相关")
+                return stories
+
+        # 获取 top stories IDs（filter_ai=False 或 Algolia 失败时的兜底路径）
         top_ids = self._make_request(f"{self.API_BASE}/topstories.json")
         if not top_ids:
             return []
         
         stories = []
         checked = 0
-        
-        for story_id in top_ids:
+
+        # 串行时代的 100 条上限是纯延迟妥协，会在 AI 内容稀疏时悄悄
+        # 截断结果；分波并发后检查 300 条的墙钟时间也只有十几个 RTT，
+        # 凑够 max_results 仍然提前停
+        for item in self._iter_items(top_ids[:300]):
             if len(stories) >= max_results:
                 break
-            if checked >= 100:  # 最多检查 100 条
-                break
-            
+
             checked += 1
-            
-            # 获取故事详情
-            item = self._make_request(f"{self.API_BASE}/item/{story_id}.json")
+
             if not item or item.get('type') != 'story':
                 continue
             
@@ -138,11 +299,10 @@ class HNFetcher:
             return []
         
         stories = []
-        for story_id in best_ids[:50]:
+        for item in self._iter_items(best_ids[:50]):
             if len(stories) >= max_results:
                 break
-            
-            item = self._make_request(f"{self.API_BASE}/item/{story_id}.json")
+
             if not item or item.get('type') != 'story':
                 continue
             
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+LLM 响应磁盘缓存 - 相同 prompt 的重复调用直接复用上次的补全
+
+同一天重跑（CI 重试、手动补发）时论文摘要和简报的 prompt 完全相同，
+没必要再付一次延迟和 token 费用。以 sha256(model + messages) 为键落盘，
+命中即返回，不发 HTTP。
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+CACHE_DIR = Path.home() / '.cache' / 'dailyreminder' / 'llm'
+CACHE_TTL = 7 * 24 * 3600  # 秒；同一 prompt 一周内不重新生成
+
+
+def _cache_file(model: str, messages: list) -> Path:
+    key = hashlib.sha256(repr((model, messages)).encode('utf-8')).hexdigest()
+    return CACHE_DIR / f'{key}.json'
+
+
+def _load(cache_file: Path) -> Optional[dict]:
+    try:
+        if time.time() - cache_file.stat().st_mtime < CACHE_TTL:
+            raw = cache_file.read_bytes()
+            return orjson.loads(raw) if orjson is not None else json.loads(raw)
+    except (OSError, ValueError):
+        pass  # 无缓存、已过期或内容损坏
+    return None
+
+
+def _store(cache_file: Path, entry: dict):
+    try:
+        CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+        if orjson is not None:
+            tmp_file.write_bytes(orjson.dumps(entry))
+        else:
+            tmp_file.write_text(json.dumps(entry, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp_file, cache_file)  # 原子替换
+    except OSError as e:
+        print(f"⚠️ 写入 LLM 缓存失败: {e}")
+
+
+def _entry_from(response) -> dict:
+    usage = response.usage
+    return {
+        'content': response.choices[0].message.content,
+        'prompt_tokens': getattr(usage, 'prompt_tokens', 0) if usage else 0,
+        'completion_tokens': getattr(usage, 'completion_tokens', 0) if usage else 0,
+    }
+
+
+def cached_chat(client, model: str, messages: list, **kwargs):
+    """带缓存的 chat.completions.create（同步客户端）
+
+    Returns:
+        (content, usage)。命中缓存时 usage 为 None（没有真实消耗），
+        调用方照常传给 usage_tracker 即可——追踪器对 None 不记账。
+    """
+    cache_file = _cache_file(model, messages)
+    entry = _load(cache_file)
+    if entry is not None:
+        return entry['content'], None
+
+    response = client.chat.completions.create(model=model, messages=messages, **kwargs)
+    _store(cache_file, _entry_from(response))
+    return response.choices[0].message.content, response.usage
+
+
+async def acached_chat(client, model: str, messages: list, **kwargs):
+    """cached_chat 的异步版本（AsyncOpenAI 客户端）"""
+    cache_file = _cache_file(model, messages)
+    entry = _load(cache_file)
+    if entry is not None:
+        return entry['content'], None
+
+    response = await client.chat.completions.create(model=model, messages=messages, **kwargs)
+    _store(cache_file, _entry_from(response))
+    return response.choices[0].message.content, response.usage
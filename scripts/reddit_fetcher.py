@@ -4,14 +4,23 @@
 Reddit 数据抓取模块 - 获取 r/LocalLLaMA 等子版块的热门帖子
 """
 
-import urllib.request
 import json
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    # orjson 直接吃 bytes，解析大 listing 比 stdlib 快数倍
+    import orjson
+except ImportError:
+    orjson = None
 from datetime import datetime
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Optional
 
 
-@dataclass
+@dataclass(slots=True, frozen=True, eq=False)
 class RedditPost:
     """Reddit 帖子数据结构"""
     title: str
@@ -23,19 +32,31 @@ class RedditPost:
     num_comments: int
     created_utc: float
     selftext: str
-    
+    # 构造时从 permalink 解析一次，去重/渲染阶段反复访问
+    # unique_id 时不再重新拆 URL
+    post_id: str
+    # 构造时转换一次，访问时不再反复做 fromtimestamp（含时区查询）
+    created_dt: datetime = field(init=False)
+
+    def __post_init__(self):
+        # frozen dataclass 里只能绕过 __setattr__ 赋值
+        object.__setattr__(self, 'created_dt', datetime.fromtimestamp(self.created_utc))
+
+    # 按 post_id 判同/求哈希：同一帖子在不同排序页重复出现时，
+    # 去重集合里视为同一条
+    def __eq__(self, other) -> bool:
+        return isinstance(other, RedditPost) and self.post_id == other.post_id
+
+    def __hash__(self) -> int:
+        return hash(self.post_id)
+
     @property
     def unique_id(self) -> str:
-        # 从 reddit_url 提取 post id
-        parts = self.reddit_url.rstrip('/').split('/')
-        for i, p in enumerate(parts):
-            if p == 'comments' and i + 1 < len(parts):
-                return parts[i + 1]
-        return self.reddit_url
-    
+        return self.post_id
+
     @property
     def created_datetime(self) -> datetime:
-        return datetime.fromtimestamp(self.created_utc)
+        return self.created_dt
     
     def to_dict(self) -> dict:
         return {
@@ -57,18 +78,31 @@ class RedditFetcher:
     
     def __init__(self):
         self.headers = {
-            'User-Agent': 'DailyReminder-Bot/1.0 (AI Research Digest)'
+            'User-Agent': 'DailyReminder-Bot/1.0 (AI Research Digest)',
+            # Accept-Encoding 交给 requests/urllib3 自己生成：装了 brotli
+            # 解码器才会广播 br，否则只报 gzip/deflate。手写 br 而没有
+            # 解码器时，服务端真回 br 响应体就解不开了
         }
-    
+        # 复用 keep-alive 连接，多个子版块请求共享一次 TCP+TLS 握手
+        self._session = requests.Session()
+        self._session.headers.update(self.headers)
+        # 连接池匹配子版块并发度；429/5xx 在传输层指数退避重试
+        self._session.mount('https://', HTTPAdapter(
+            pool_maxsize=10,
+            max_retries=Retry(total=3, backoff_factor=0.5,
+                              status_forcelist=[429, 500, 502, 503, 504])
+        ))
+
     def _make_request(self, url: str) -> dict:
         """发送请求"""
-        req = urllib.request.Request(url, headers=self.headers)
         try:
-            with urllib.request.urlopen(req, timeout=15) as response:
-                return json.loads(response.read().decode('utf-8'))
-        except urllib.error.HTTPError as e:
-            print(f"Reddit API 错误: {e.code}")
-            return {}
+            response = self._session.get(url, timeout=15)
+            if response.status_code >= 400:
+                print(f"Reddit API 错误: {response.status_code}")
+                return {}
+            if orjson is not None:
+                return orjson.loads(response.content)
+            return response.json()
         except Exception as e:
             print(f"请求失败: {e}")
             return {}
@@ -89,7 +123,9 @@ class RedditFetcher:
             limit: 获取数量
             min_score: 最低分数过滤
         """
-        url = f"{self.BASE_URL}/r/{subreddit}/{sort}.json?limit={limit}"
+        # raw_json=1 让 Reddit 返回未经 HTML 转义的 JSON，
+        # 省掉 &lt;/&amp; 之类实体的解码和额外字节
+        url = f"{self.BASE_URL}/r/{subreddit}/{sort}.json?limit={limit}&raw_json=1"
         
         data = self._make_request(url)
         if not data or 'data' not in data:
@@ -105,34 +141,56 @@ class RedditFetcher:
             if item.get('score', 0) < min_score:
                 continue
             
+            permalink = item.get('permalink', '')
+            reddit_url = f"{self.BASE_URL}{permalink}"
+
             # 获取链接（如果是 self post，用 reddit 链接）
             post_url = item.get('url', '')
             if item.get('is_self', False):
-                post_url = f"{self.BASE_URL}{item.get('permalink', '')}"
-            
+                post_url = reddit_url
+
+            # permalink 格式固定为 /r/<sub>/comments/<id>/<slug>/，
+            # 这里解析一次 post id，供 unique_id 直接返回
+            parts = permalink.strip('/').split('/')
+            try:
+                post_id = parts[parts.index('comments') + 1]
+            except (ValueError, IndexError):
+                post_id = reddit_url
+
             post = RedditPost(
                 title=item.get('title', ''),
                 url=post_url,
-                reddit_url=f"{self.BASE_URL}{item.get('permalink', '')}",
+                reddit_url=reddit_url,
                 subreddit=subreddit,
                 author=item.get('author', 'unknown'),
                 score=item.get('score', 0),
                 num_comments=item.get('num_comments', 0),
                 created_utc=item.get('created_utc', 0),
-                selftext=item.get('selftext', '')[:500]  # 限制长度
+                selftext=item.get('selftext', '')[:500],  # 限制长度
+                post_id=post_id
             )
             posts.append(post)
         
         return posts
     
     def fetch_all(self, max_per_subreddit: int = 10) -> List[RedditPost]:
-        """获取所有目标子版块的帖子"""
+        """获取所有目标子版块的帖子（各子版块并发请求）"""
         all_posts = []
-        for subreddit in self.TARGET_SUBREDDITS:
-            print(f"  🔴 获取 r/{subreddit}...")
-            posts = self.fetch_subreddit(subreddit, limit=max_per_subreddit)
-            all_posts.extend(posts)
-            print(f"     找到 {len(posts)} 条")
+        # 子版块列表会继续增长；并发后总耗时保持在约一次往返
+        with ThreadPoolExecutor(max_workers=max(len(self.TARGET_SUBREDDITS), 1)) as executor:
+            results = executor.map(
+                lambda subreddit: self.fetch_subreddit(subreddit, limit=max_per_subreddit),
+                self.TARGET_SUBREDDITS
+            )
+            # 聚合时就地按 post_id 去重（O(N) 集合判重），
+            # 不把重复项留给下游再扫
+            seen = set()
+            for subreddit, posts in zip(self.TARGET_SUBREDDITS, results):
+                for post in posts:
+                    if post not in seen:
+                        seen.add(post)
+                        all_posts.append(post)
+                print(f"  🔴 r/{subreddit}: 找到 {len(posts)} 条")
         return all_posts
 
 
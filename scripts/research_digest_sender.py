@@ -3,16 +3,30 @@
 """
 AI 研究摘要邮件推送
 整合 arXiv 论文、YouTube、RSS、GitHub、Reddit、HN，发送每日研究摘要
+
+约定: smtplib / ssl / email.* 这类只有发信路径用到的重模块在
+发送方法内部延迟导入，把本模块当库引用（只生成 HTML）时不付
+SMTP/SSL 的导入开销。
 """
 
 import os
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.header import Header
+import html
+import json
+import pickle
+import hashlib
+import re
+import string
+import asyncio
+import threading
+from collections import defaultdict
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import chain, islice
+from pathlib import Path
 from typing import List, Dict, Optional
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI
 import time
 
 from arxiv_fetcher import ArxivFetcher, ArxivPaper, filter_recent_papers
@@ -23,6 +37,318 @@ from reddit_fetcher import RedditFetcher, RedditPost
 from hn_fetcher import HNFetcher, HNStory
 from deduplicator import Deduplicator
 from ai_curator import AICurator
+from llm_cache import acached_chat, cached_chat
+
+# 邮件里的 CSS 源文件（保持可读缩进，便于维护）；导入时 minify 一次，
+# 每封邮件少传 ~40% 的样式字节
+_CSS_SOURCE = '''
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 900px;
+            margin: 0 auto;
+            padding: 20px;
+            background: #f5f7fa;
+        }
+        .container {
+            background: white;
+            border-radius: 16px;
+            padding: 40px;
+            box-shadow: 0 4px 20px rgba(0,0,0,0.08);
+        }
+        .header {
+            text-align: center;
+            padding: 30px 0;
+            border-bottom: 3px solid #667eea;
+            margin-bottom: 30px;
+        }
+        .header h1 {
+            color: #2d3748;
+            margin: 0;
+            font-size: 32px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            -webkit-background-clip: text;
+            -webkit-text-fill-color: transparent;
+        }
+        .date {
+            color: #718096;
+            font-size: 16px;
+            margin-top: 10px;
+        }
+        .briefing-box {
+            background: linear-gradient(135deg, #e6fffa 0%, #b2f5ea 100%);
+            border-radius: 12px;
+            padding: 25px;
+            margin-bottom: 40px;
+            border-left: 5px solid #38b2ac;
+        }
+        .briefing-title {
+            font-size: 20px;
+            font-weight: bold;
+            color: #234e52;
+            margin-bottom: 15px;
+            display: flex;
+            align-items: center;
+        }
+        .section {
+            margin: 40px 0;
+        }
+        .section-header {
+            display: flex;
+            align-items: center;
+            margin-bottom: 25px;
+            padding-bottom: 15px;
+            border-bottom: 2px solid #e2e8f0;
+        }
+        .section-icon {
+            font-size: 28px;
+            margin-right: 15px;
+        }
+        .section-title {
+            font-size: 24px;
+            color: #2d3748;
+            margin: 0;
+        }
+        .section-subtitle {
+            font-size: 14px;
+            color: #718096;
+            margin-left: auto;
+        }
+        /* Paper Cards */
+        .paper-card {
+            background: #f7fafc;
+            border-radius: 12px;
+            padding: 20px;
+            margin: 15px 0;
+            border-left: 4px solid #667eea;
+            transition: transform 0.2s, box-shadow 0.2s;
+        }
+        .paper-card:hover {
+            transform: translateX(5px);
+            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.15);
+        }
+        .paper-card.ad { border-left-color: #48bb78; }
+        .paper-title { font-size: 16px; font-weight: 600; margin-bottom: 8px; }
+        .paper-title a { color: #2d3748; text-decoration: none; }
+        .paper-title a:hover { color: #667eea; }
+        .paper-authors { font-size: 13px; color: #718096; margin-bottom: 10px; }
+        .paper-summary { font-size: 14px; color: #4a5568; line-height: 1.7; }
+        .paper-meta { display: flex; gap: 15px; margin-top: 12px; font-size: 12px; }
+        .paper-tag { display: inline-block; padding: 3px 10px; background: #edf2f7; border-radius: 12px; color: #4a5568; }
+
+        /* Feed Cards */
+        .feed-list { list-style: none; padding: 0; }
+        .feed-item {
+            padding: 15px;
+            border-bottom: 1px solid #edf2f7;
+            display: flex;
+            flex-direction: column;
+        }
+        .feed-item:last-child { border-bottom: none; }
+        .feed-source {
+            font-size: 12px;
+            text-transform: uppercase;
+            color: #718096;
+            font-weight: bold;
+            margin-bottom: 4px;
+        }
+        .feed-title { font-size: 16px; font-weight: 600; margin-bottom: 5px; }
+        .feed-title a { color: #2b6cb0; text-decoration: none; }
+        .feed-title a:hover { text-decoration: underline; }
+        .feed-date { font-size: 12px; color: #a0aec0; }
+
+        .video-card {
+            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
+            border-radius: 12px;
+            padding: 20px;
+            margin: 15px 0;
+            color: white;
+        }
+        .video-title a { color: #ff6b6b; text-decoration: none; }
+
+        .footer {
+            margin-top: 50px;
+            padding-top: 30px;
+            border-top: 2px solid #e2e8f0;
+            text-align: center;
+            color: #718096;
+            font-size: 14px;
+        }
+        .stats-box {
+            background: #f1f5f9;
+            border-radius: 8px;
+            padding: 15px;
+            margin-top: 30px;
+            border: 1px solid #e2e8f0;
+            text-align: left;
+        }
+'''
+
+_MINIFIED_CSS = re.sub(r'\s*([:;{},])\s*', r'\1',
+                       re.sub(r'\s+', ' ', _CSS_SOURCE)).strip()
+
+# 邮件 HTML 骨架：模块导入时解析一次，每次发送只做占位符替换，
+# 不再在每次调用里重新构造 ~50KB 的 f-string（CSS 也无需 {{ }} 转义）
+_DIGEST_TEMPLATE = string.Template('''
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>''' + _MINIFIED_CSS + '''</style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <h1>🔬 AI 研究周报</h1>
+            <div class="date">$today</div>
+        </div>
+
+        <!-- AI Daily Briefing -->
+        <div class="briefing-box">
+            <div class="briefing-title">☕️ 今日 AI 简报</div>
+            <div style="color: #2c7a7b; font-size: 15px; line-height: 1.8;">
+                $briefing_html
+            </div>
+        </div>
+
+        <!-- arXiv Papers -->
+        <div class="section">
+            <div class="section-header">
+                <span class="section-icon">📚</span>
+                <h2 class="section-title">核心论文 (ArXiv)</h2>
+            </div>
+            <h3 style="color: #4a5568; margin-top:20px;">🔥 大模型前沿</h3>
+            $llm_papers_html
+
+            <h3 style="color: #4a5568; margin-top:30px;">📊 广告与推荐算法</h3>
+            $ad_papers_html
+        </div>
+
+        <!-- RSS Feeds -->
+        <div class="section">
+            <div class="section-header">
+                <span class="section-icon">📡</span>
+                <h2 class="section-title">业界动态</h2>
+            </div>
+
+            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 40px;">
+                <div>
+                    <h3 style="border-bottom: 2px solid #ed8936; padding-bottom: 10px; color: #c05621;">🏢 AI Labs 更新</h3>
+                    $ai_labs_html
+                </div>
+                <div>
+                    <h3 style="border-bottom: 2px solid #48bb78; padding-bottom: 10px; color: #2f855a;">💰 顶级风投观点</h3>
+                    $vc_html
+                </div>
+            </div>
+
+            <div style="margin-top: 40px;">
+                 <h3 style="border-bottom: 2px solid #4299e1; padding-bottom: 10px; color: #2b6cb0;">📰 科技新闻精选</h3>
+                 $news_html
+            </div>
+        </div>
+
+        <!-- YouTube Videos -->
+        <div class="section">
+            <div class="section-header">
+                <span class="section-icon">🎬</span>
+                <h2 class="section-title">科技领袖访谈</h2>
+            </div>
+            $youtube_html
+        </div>
+
+        <!-- New Sources: GitHub, Reddit, HN -->
+        $community_html
+
+        $stats_html
+
+        <div class="footer">
+            <p>📅 $today | Daily Info System</p>
+            <p>💡 Stay Hungry, Stay Foolish</p>
+        </div>
+    </div>
+</body>
+</html>
+''')
+
+# 卡片级片段同样预编译，循环里只做占位符替换，不再逐次重建 f-string；
+# 外部来源的标题/作者等字段统一过 html.escape，顺带堵住标题里的
+# <>& 破坏邮件布局的问题
+_PAPER_CARD_TEMPLATE = string.Template('''
+            <div class="$cls">
+                <div class="paper-title">
+                    <a href="$abs_url" target="_blank">$title</a>
+                </div>
+                <div class="paper-authors">👥 $authors</div>
+                <div class="paper-summary">$summary</div>
+                <div class="paper-meta">
+                    <span class="paper-tag">📅 $published</span>
+                    <a href="$pdf_url" class="paper-link" target="_blank">📄 PDF</a>
+                </div>
+            </div>
+            ''')
+
+_FEED_ITEM_TEMPLATE = string.Template('''
+            <div class="feed-item">
+                <div class="feed-source">$source</div>
+                <div class="feed-title"><a href="$link" target="_blank">$title</a></div>
+                <div class="feed-date">$date</div>
+            </div>
+            ''')
+
+_SEARCH_LINK_TEMPLATE = string.Template(
+    '<a href="$url" style="padding:5px 15px; background:#e53e3e; color:white; '
+    'border-radius:15px; text-decoration:none;">$leader</a>')
+
+_VIDEO_CARD_TEMPLATE = string.Template('''
+                <div class="video-card">
+                    <div class="video-title"><a href="$watch_url" target="_blank">🎥 $title</a></div>
+                    <div style="font-size: 12px; color: #a0aec0; margin-top:5px;">$description...</div>
+                </div>
+                ''')
+
+_STATS_TEMPLATE = string.Template('''
+        <div class="stats-box">
+            <h4 style="margin:0 0 10px 0; color:#4a5568;">⚙️ 系统运行统计</h4>
+            <div style="display:flex; justify-content:space-between; font-size:12px; color:#718096;">
+                <div>
+                    <strong>🤖 AI 模型 (Qwen-72B)</strong><br>
+                    调用次数: $llm_calls<br>
+                    Input Tokens: $llm_input_tokens<br>
+                    Output Tokens: $llm_output_tokens
+                </div>
+                <div>
+                    <strong>🎬 YouTube API</strong><br>
+                    API 调用: $youtube_api_calls<br>
+                    Quota 消耗: $youtube_quota units
+                </div>
+            </div>
+        </div>
+''')
+
+@dataclass(frozen=True)
+class _SMTPConfig:
+    """SMTP 配置快照 - __init__ 时从环境变量读一次
+
+    发送路径不再逐次 os.getenv + int()，配置缺失也能在启动时
+    就暴露出来，而不是等到发信那一刻。
+    """
+    server: str
+    port: int
+    user: Optional[str]
+    password: Optional[str]
+
+    @classmethod
+    def from_env(cls) -> '_SMTPConfig':
+        return cls(
+            server=os.getenv('SMTP_SERVER', 'smtp.qq.com'),
+            port=int(os.getenv('SMTP_PORT', '465')),
+            user=os.getenv('FROM_EMAIL'),
+            password=os.getenv('EMAIL_PASSWORD'),
+        )
+
 
 class UsageTracker:
     """资源使用统计追踪器"""
@@ -30,24 +356,77 @@ class UsageTracker:
         self.llm_calls = 0
         self.llm_input_tokens = 0
         self.llm_output_tokens = 0
+        # 服务端 prefix cache 命中的输入 token 数，用于验证提示词
+        # 前缀编排的实际命中率
+        self.llm_cached_tokens = 0
+        # 因摘要过短/已是中文而跳过的摘要调用数，用于量化省下的开销
+        self.llm_skipped_summaries = 0
+        # 分模型调用计数：摘要/简报走不同档位的模型后分开观察
+        self.llm_calls_by_model = defaultdict(int)
         self.youtube_api_calls = 0
         self.youtube_quota = 0
-    
-    def log_llm_usage(self, usage):
+        # 抓取阶段并发后，多个线程会同时记账
+        self._lock = threading.Lock()
+
+    def log_llm_usage(self, usage, model: str = None):
         """记录 LLM Token 使用"""
         if usage:
-            self.llm_calls += 1
-            self.llm_input_tokens += getattr(usage, 'prompt_tokens', 0)
-            self.llm_output_tokens += getattr(usage, 'completion_tokens', 0)
-            
+            with self._lock:
+                self.llm_calls += 1
+                if model:
+                    self.llm_calls_by_model[model] += 1
+                self.llm_input_tokens += getattr(usage, 'prompt_tokens', 0)
+                self.llm_output_tokens += getattr(usage, 'completion_tokens', 0)
+                self.llm_cached_tokens += getattr(
+                    getattr(usage, 'prompt_tokens_details', None), 'cached_tokens', 0) or 0
+
+    def log_skipped_summaries(self, count: int):
+        """记录跳过的摘要生成数"""
+        with self._lock:
+            self.llm_skipped_summaries += count
+
     def log_youtube_usage(self, calls: int, quota: int):
         """记录 YouTube API 使用"""
-        self.youtube_api_calls += calls
-        self.youtube_quota += quota
+        with self._lock:
+            self.youtube_api_calls += calls
+            self.youtube_quota += quota
 
 class ResearchDigestSender:
     """AI 研究摘要邮件发送器"""
-    
+
+    # 翻译+一句话总结这种任务小模型就够了，计费和延迟都低一个档位；
+    # 简报要的是编辑质量，留给 32B
+    SUMMARY_MODEL = "Qwen/Qwen3-8B"
+    BRIEFING_MODEL = "Qwen/Qwen3-32B"
+
+    # arXiv 摘要可达 1500-3000 字符，信号基本集中在前面；截断后
+    # 摘要路径的 prompt_tokens 少 30-50%，首 token 延迟也更低
+    MAX_ABSTRACT_CHARS = 1200
+    # 简报 prompt 里的标题同理，个别超长标题没必要整条塞进去
+    MAX_TITLE_CHARS = 200
+
+    # 批量摘要的 system 指令同样提成常量：各类别的批量调用共享同一个
+    # 字符串对象，逐字节一致，服务端 prefix cache 对第 2-N 次调用可
+    # 直接命中这段前缀
+    SUMMARY_SYSTEM_PROMPT = (
+        "你是一个专业的AI研究助手。下面给出若干篇编号的论文摘要，"
+        "请逐篇将摘要翻译成中文，并用一句话总结核心贡献。"
+        "每篇的结果格式为：先给出中文摘要，换行后给出'核心贡献：'。"
+        "只输出一个 JSON 数组，形如 [{\"index\": 0, \"summary\": \"...\"}]，"
+        "不要输出其他内容。"
+    )
+
+    # 简报的全部固定指令放进 system 消息：跨天/重试运行时这段是
+    # 严格不变的前缀，服务端 prefix cache 能整段命中（每日变化的
+    # 条目列表放在最后的 user 消息里）
+    BRIEFING_SYSTEM_PROMPT = (
+        "你是一位资深的科技主编，擅长从海量信息中提炼关键洞察。"
+        "请根据用户提供的当天收集到的信息，撰写一份简短的'每日 AI 简报' (Daily Briefing)。"
+        "要求：用中文撰写，语气专业且引人入胜。分为三个简短段落："
+        "1. 学术突破 (基于论文); 2. 行业动态 (基于新闻); 3. 值得关注 (综合)。"
+        "总字数控制在 400 字以内。"
+    )
+
     def __init__(self):
         self.arxiv_fetcher = ArxivFetcher(max_results=15)
         self.feed_fetcher = FeedFetcher(days_lookback=2)
@@ -57,18 +436,31 @@ class ResearchDigestSender:
         self.deduplicator = Deduplicator()
         self.youtube_api_key = os.getenv('YOUTUBE_API_KEY')
         self.usage_tracker = UsageTracker()
+        # SMTP 配置只读一次，发送路径直接用快照
+        self._smtp_cfg = _SMTPConfig.from_env()
         
         # Initialize OpenAI client for paper summarization
         api_key = os.getenv('MODELSCOPE_API_KEY')
         if not api_key:
             raise ValueError("请设置 MODELSCOPE_API_KEY 环境变量")
+        # 显式配置 httpx 连接池（openai 自带 httpx 传输层）：
+        # keepalive 连接数撑满并发度，批量摘要的多个调用复用同一条
+        # TLS 连接，而不是各自重新握手
+        _limits = httpx.Limits(max_keepalive_connections=20, max_connections=20)
         self.client = OpenAI(
             base_url='https://api-inference.modelscope.cn/v1/',
-            api_key=api_key
+            api_key=api_key,
+            http_client=httpx.Client(limits=_limits, timeout=60)
+        )
+        # 论文摘要走异步客户端，多篇论文的 LLM 等待用 gather 重叠
+        self.async_client = AsyncOpenAI(
+            base_url='https://api-inference.modelscope.cn/v1/',
+            api_key=api_key,
+            http_client=httpx.AsyncClient(limits=_limits, timeout=60)
         )
         
-        # AI Curator (shares the same client)
-        self.ai_curator = AICurator(client=self.client)
+        # AI Curator (uses its own AsyncOpenAI client, same API key)
+        self.ai_curator = AICurator()
         
         if self.youtube_api_key:
             self.youtube_fetcher = YouTubeFetcher(api_key=self.youtube_api_key, max_results=5)
@@ -79,62 +471,121 @@ class ResearchDigestSender:
         # 选择要关注的科技领袖
         self.selected_leaders = ["Elon Musk", "Jensen Huang", "Sam Altman"]
     
-    def summarize_paper(self, title: str, abstract: str) -> str:
-        """使用 AI 翻译并总结论文"""
-        try:
-            response = self.client.chat.completions.create(
-                model="Qwen/Qwen3-32B",
-                messages=[
-                    {"role": "system", "content": "你是一个专业的AI研究助手。请将给定的论文摘要翻译成中文，并用一句话总结这篇论文的核心贡献。格式要求：先给出中文摘要，换行后给出'核心贡献：'。"},
-                    {"role": "user", "content": f"Title: {title}\nAbstract: {abstract}"}
-                ],
-                extra_body={"enable_thinking": False}
-            )
-            self.usage_tracker.log_llm_usage(response.usage)
-            return response.choices[0].message.content
-        except Exception as e:
-            print(f"❌ AI 摘要生成失败: {e}")
-            return abstract
+    @staticmethod
+    def _dedup_feed_items(items) -> List[FeedItem]:
+        """按链接去重，保持原顺序
+
+        同一条新闻经常同时出现在 Tech_News 源和 HN 高分过滤源里，
+        没必要在邮件里渲染两遍。
+        """
+        seen = set()
+        out = []
+        for item in items:
+            if item.link not in seen:
+                seen.add(item.link)
+                out.append(item)
+        return out
+
+    @staticmethod
+    def _needs_summary(abstract: str) -> bool:
+        """判断摘要是否值得花一次 LLM 调用翻译总结
+
+        过短的摘要没什么可压缩的，已经是中文的摘要不用翻译，
+        两类都直接原样展示。
+        """
+        if len(abstract) < 200:
+            return False
+        if sum(1 for c in abstract if '\u4e00' <= c <= '\u9fff') > 20:
+            return False
+        return True
+
+    async def _summarize_batch_async(self, papers: List[ArxivPaper], sem: asyncio.Semaphore) -> List[str]:
+        """一次 LLM 调用总结一批论文（异步，信号量限制并发防触发限流）
+
+        逐篇调用时每篇都单独付一次往返 + system prompt 的 prefill 成本；
+        把整批摘要编号后塞进一个 prompt，往返次数从 N 降到 1。
+        模型按 JSON 数组返回，这里按 index 映射回去；解析失败整批
+        回退原文，不让单次格式翻车毁掉邮件。
+        """
+        numbered = "\n\n".join(
+            f"[{i}] Title: {p.title}\nAbstract: {p.summary[:self.MAX_ABSTRACT_CHARS]}"
+            for i, p in enumerate(papers)
+        )
+        async with sem:
+            try:
+                # 磁盘缓存按 prompt 哈希命中：同一天重跑时不再重复调用
+                content, usage = await acached_chat(
+                    self.async_client,
+                    model=self.SUMMARY_MODEL,
+                    messages=[
+                        {"role": "system", "content": self.SUMMARY_SYSTEM_PROMPT},
+                        {"role": "user", "content": numbered}
+                    ],
+                    extra_body={"enable_thinking": False}
+                )
+                self.usage_tracker.log_llm_usage(usage, model=self.SUMMARY_MODEL)
+                results = [p.summary for p in papers]
+                # 容忍模型包一层 ```json 代码栅栏，以及摘要里未转义的换行
+                start, end = content.find('['), content.rfind(']')
+                for entry in json.loads(content[start:end + 1], strict=False):
+                    idx = entry.get('index')
+                    if isinstance(idx, int) and 0 <= idx < len(results) and entry.get('summary'):
+                        results[idx] = entry['summary']
+                return results
+            except Exception as e:
+                print(f"❌ AI 摘要生成失败: {e}")
+                return [p.summary for p in papers]
+
+    async def _summarize_papers(self, batches: List[List[ArxivPaper]]) -> List[List[str]]:
+        """各类别各发一个批量请求，并发等待：总耗时约等于最慢一批"""
+        sem = asyncio.Semaphore(5)
+        return await asyncio.gather(*[
+            self._summarize_batch_async(batch, sem) for batch in batches
+        ])
 
     def generate_daily_briefing(self, papers: Dict, feeds: Dict, videos: Dict) -> str:
         """生成每日 AI 简报"""
         print("\n🤖 正在生成每日 AI 简报...")
         
-        # 准备输入数据 provided to LLM
-        context = "请根据以下今天收集到的信息，为我撰写一份简短的'每日 AI 简报' (Daily Briefing)。\n\n"
-        
+        # 准备输入数据 provided to LLM（攒片段一次 join，islice 不做 切片+拼接 的中间列表）
         # Top 3 LLM Papers
-        context += "【热门大模型论文】\n"
-        for p in papers.get('llm', [])[:3]:
-            context += f"- {p.title}\n"
-            
+        parts = ["【热门大模型论文】"]
+        parts.extend(f"- {p.title[:self.MAX_TITLE_CHARS]}" for p in islice(papers.get('llm', []), 3))
+
         # Top News
-        context += "\n【重要科技新闻】\n"
-        news_items = feeds.get('Tech_News', [])[:3] + feeds.get('AI_Labs', [])[:3]
-        for item in news_items:
-            context += f"- {item.title} ({item.source_name})\n"
-            
+        parts.append("\n【重要科技新闻】")
+        news_items = self._dedup_feed_items(
+            chain(islice(feeds.get('Tech_News', []), 3),
+                  islice(feeds.get('AI_Labs', []), 3)))
+        parts.extend(
+            f"- {item.title[:self.MAX_TITLE_CHARS]} ({item.source_name})"
+            for item in news_items
+        )
+
         # Top Videos
-        context += "\n【最新访谈】\n"
+        parts.append("\n【最新访谈】")
         video_data = videos.get('data', {})
         if videos['type'] == 'api':
-            for leader, vids in video_data.items():
-                if vids:
-                    context += f"- {leader}: {vids[0].title}\n"
-        
-        context += "\n要求：用中文撰写，语气专业且引人入胜。分为三个简短段落：1. 学术突破 (基于论文); 2. 行业动态 (基于新闻); 3. 值得关注 (综合)。总字数控制在 400 字以内。"
+            parts.extend(
+                f"- {leader}: {vids[0].title}"
+                for leader, vids in video_data.items() if vids
+            )
+
+        context = "\n".join(parts)
 
         try:
-            response = self.client.chat.completions.create(
-                model="Qwen/Qwen3-32B",
+            # 简报 prompt 由当天条目拼成，重跑时完全一致，直接命中磁盘缓存
+            content, usage = cached_chat(
+                self.client,
+                model=self.BRIEFING_MODEL,
                 messages=[
-                    {"role": "system", "content": "你是一位资深的科技主编，擅长从海量信息中提炼关键洞察。"},
+                    {"role": "system", "content": self.BRIEFING_SYSTEM_PROMPT},
                     {"role": "user", "content": context}
                 ],
                 extra_body={"enable_thinking": False}
             )
-            self.usage_tracker.log_llm_usage(response.usage)
-            return response.choices[0].message.content
+            self.usage_tracker.log_llm_usage(usage, model=self.BRIEFING_MODEL)
+            return content
         except Exception as e:
             print(f"❌ 简报生成失败: {e}")
             return "无法生成今日简报，请直接阅读下方详细内容。"
@@ -146,20 +597,37 @@ class ResearchDigestSender:
         print("=" * 60)
         
         papers = self.arxiv_fetcher.fetch_all()
-        
-        # 过滤最近 7 天的论文
+
+        # 过滤最近 7 天的论文（摘要生成拆到 summarize_papers，
+        # 以便 run() 把它和简报生成并行）
         for category in papers:
             papers[category] = filter_recent_papers(papers[category], days=7)
-            
-            # AI 摘要生成 (只处理前5篇以节省资源和时间)
-            if papers[category]:
-                print(f"\n🤖 正在生成 {category} 类别的 AI 摘要...")
-                for i, paper in enumerate(papers[category][:5]):
-                    print(f"  [{i+1}/{min(len(papers[category]), 5)}] 处理: {paper.title[:30]}...")
-                    paper.summary = self.summarize_paper(paper.title, paper.summary)
-        
+
         print(f"✅ 获取完成: {len(papers['llm'])} 篇大模型论文, {len(papers['advertising'])} 篇广告领域论文")
         return papers
+
+    def summarize_papers(self, papers: Dict[str, List[ArxivPaper]]):
+        """为各类别前 5 篇论文生成 AI 摘要（原地写回 paper.summary）"""
+        batches = []
+        skipped = 0
+        for category in papers:
+            candidates = papers[category][:5]
+            batch = [p for p in candidates if self._needs_summary(p.summary)]
+            skipped += len(candidates) - len(batch)
+            if batch:
+                batches.append(batch)
+        if skipped:
+            self.usage_tracker.log_skipped_summaries(skipped)
+            print(f"  ⏭️ {skipped} 篇摘要过短或已是中文，跳过 AI 摘要")
+
+        # AI 摘要生成：每个类别一个批量请求，各类别并发跑
+        if batches:
+            total = sum(len(batch) for batch in batches)
+            print(f"\n🤖 正在批量生成 {total} 篇论文的 AI 摘要...")
+            batch_summaries = asyncio.run(self._summarize_papers(batches))
+            for batch, summaries in zip(batches, batch_summaries):
+                for paper, summary in zip(batch, summaries):
+                    paper.summary = summary
     
     def fetch_feeds(self) -> Dict[str, List[FeedItem]]:
         """获取 RSS 订阅"""
@@ -168,23 +636,52 @@ class ResearchDigestSender:
         print("=" * 60)
         return self.feed_fetcher.fetch_all()
 
+    # YouTube 搜索结果缓存时长：重试/补发运行直接复用，不再消耗配额
+    YOUTUBE_CACHE_TTL = 6 * 3600
+
+    def _youtube_cache_file(self) -> Path:
+        key = hashlib.sha256(repr(tuple(self.selected_leaders)).encode('utf-8')).hexdigest()[:16]
+        return Path.home() / '.cache' / 'dailyreminder' / f'youtube_{key}.pkl'
+
     def fetch_youtube_videos(self) -> Dict:
         """获取 YouTube 视频"""
         print("\n" + "=" * 60)
         print("🎬 正在获取 YouTube 视频...")
         print("=" * 60)
-        
-        if self.youtube_fetcher:
-            videos = self.youtube_fetcher.fetch_selected_leaders(self.selected_leaders)
-            # Log usage
-            self.usage_tracker.log_youtube_usage(
-                self.youtube_fetcher.request_count,
-                self.youtube_fetcher.total_quota_used
-            )
-            return {"type": "api", "data": videos}
-        else:
+
+        if not self.youtube_fetcher:
+            # 无 API 路径只拼静态搜索链接，没有网络调用，不值得缓存
             recommendations = self.youtube_no_api.get_recommendations(self.selected_leaders)
             return {"type": "recommendations", "data": recommendations}
+
+        # SMTP 失败重跑等短间隔重试直接复用上次结果，
+        # 不再花一遍搜索配额（search 每次 100 units）
+        cache_file = self._youtube_cache_file()
+        try:
+            if time.time() - cache_file.stat().st_mtime < self.YOUTUBE_CACHE_TTL:
+                with open(cache_file, 'rb') as f:
+                    cached = pickle.load(f)
+                print("  ♻️ 命中 YouTube 结果缓存，跳过 API 调用")
+                return cached
+        except (OSError, pickle.PickleError, EOFError, AttributeError):
+            pass  # 无缓存、已过期或格式已变
+
+        videos = self.youtube_fetcher.fetch_selected_leaders(self.selected_leaders)
+        # Log usage
+        self.usage_tracker.log_youtube_usage(
+            self.youtube_fetcher.request_count,
+            self.youtube_fetcher.total_quota_used
+        )
+        result = {"type": "api", "data": videos}
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(result, f)
+            os.replace(tmp_file, cache_file)  # 原子替换
+        except OSError:
+            pass
+        return result
     
     def fetch_github_data(self) -> Dict:
         """获取 GitHub Issues 和 Trending"""
@@ -228,303 +725,85 @@ class ResearchDigestSender:
         youtube_data: Dict,
         github_data: Dict = None,
         reddit_posts: List = None,
-        hn_stories: List = None
+        hn_stories: List = None,
+        now: Optional[datetime] = None
     ) -> str:
-        """生成 HTML 邮件内容"""
-        today = datetime.now().strftime('%Y年%m月%d日')
-        
+        """生成 HTML 邮件内容（骨架模板预编译，这里只做占位符替换）"""
+        # run() 把同一个 now 传进来，避免跨午夜运行时邮件正文和
+        # 存档文件名出现不同日期
+        today = (now or datetime.now()).strftime('%Y年%m月%d日')
+
+        # 每个版块只展示前几条：在这里统一切片，各 helper 不再各自
+        # [:N]，切掉的长列表（连同超长摘要）在渲染前即可被回收
+        papers = {k: v[:6] for k, v in papers.items()}
+        feeds = {k: v[:8] for k, v in feeds.items()}
+        if youtube_data.get('type') == 'api':
+            youtube_data = {
+                **youtube_data,
+                'data': {k: v[:2] for k, v in youtube_data.get('data', {}).items()},
+            }
+
         # Render markdown briefing to simple HTML paragraphs
         briefing_html = "".join([f"<p>{line}</p>" for line in briefing.split('\n') if line.strip()])
-        
-        # Stats HTML
-        stats_html = f'''
-        <div class="stats-box">
-            <h4 style="margin:0 0 10px 0; color:#4a5568;">⚙️ 系统运行统计</h4>
-            <div style="display:flex; justify-content:space-between; font-size:12px; color:#718096;">
-                <div>
-                    <strong>🤖 AI 模型 (Qwen-72B)</strong><br>
-                    调用次数: {self.usage_tracker.llm_calls}<br>
-                    Input Tokens: {self.usage_tracker.llm_input_tokens}<br>
-                    Output Tokens: {self.usage_tracker.llm_output_tokens}
-                </div>
-                <div>
-                    <strong>🎬 YouTube API</strong><br>
-                    API 调用: {self.usage_tracker.youtube_api_calls}<br>
-                    Quota 消耗: {self.usage_tracker.youtube_quota} units
-                </div>
-            </div>
-        </div>
-        '''
 
-        html = f'''
-<!DOCTYPE html>
-<html>
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 900px;
-            margin: 0 auto;
-            padding: 20px;
-            background: #f5f7fa;
-        }}
-        .container {{
-            background: white;
-            border-radius: 16px;
-            padding: 40px;
-            box-shadow: 0 4px 20px rgba(0,0,0,0.08);
-        }}
-        .header {{
-            text-align: center;
-            padding: 30px 0;
-            border-bottom: 3px solid #667eea;
-            margin-bottom: 30px;
-        }}
-        .header h1 {{
-            color: #2d3748;
-            margin: 0;
-            font-size: 32px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            -webkit-background-clip: text;
-            -webkit-text-fill-color: transparent;
-        }}
-        .date {{
-            color: #718096;
-            font-size: 16px;
-            margin-top: 10px;
-        }}
-        .briefing-box {{
-            background: linear-gradient(135deg, #e6fffa 0%, #b2f5ea 100%);
-            border-radius: 12px;
-            padding: 25px;
-            margin-bottom: 40px;
-            border-left: 5px solid #38b2ac;
-        }}
-        .briefing-title {{
-            font-size: 20px;
-            font-weight: bold;
-            color: #234e52;
-            margin-bottom: 15px;
-            display: flex;
-            align-items: center;
-        }}
-        .section {{
-            margin: 40px 0;
-        }}
-        .section-header {{
-            display: flex;
-            align-items: center;
-            margin-bottom: 25px;
-            padding-bottom: 15px;
-            border-bottom: 2px solid #e2e8f0;
-        }}
-        .section-icon {{
-            font-size: 28px;
-            margin-right: 15px;
-        }}
-        .section-title {{
-            font-size: 24px;
-            color: #2d3748;
-            margin: 0;
-        }}
-        .section-subtitle {{
-            font-size: 14px;
-            color: #718096;
-            margin-left: auto;
-        }}
-        /* Paper Cards */
-        .paper-card {{
-            background: #f7fafc;
-            border-radius: 12px;
-            padding: 20px;
-            margin: 15px 0;
-            border-left: 4px solid #667eea;
-            transition: transform 0.2s, box-shadow 0.2s;
-        }}
-        .paper-card:hover {{
-            transform: translateX(5px);
-            box-shadow: 0 4px 12px rgba(102, 126, 234, 0.15);
-        }}
-        .paper-card.ad {{ border-left-color: #48bb78; }}
-        .paper-title {{ font-size: 16px; font-weight: 600; margin-bottom: 8px; }}
-        .paper-title a {{ color: #2d3748; text-decoration: none; }}
-        .paper-title a:hover {{ color: #667eea; }}
-        .paper-authors {{ font-size: 13px; color: #718096; margin-bottom: 10px; }}
-        .paper-summary {{ font-size: 14px; color: #4a5568; line-height: 1.7; }}
-        .paper-meta {{ display: flex; gap: 15px; margin-top: 12px; font-size: 12px; }}
-        .paper-tag {{ display: inline-block; padding: 3px 10px; background: #edf2f7; border-radius: 12px; color: #4a5568; }}
-        
-        /* Feed Cards */
-        .feed-list {{ list-style: none; padding: 0; }}
-        .feed-item {{
-            padding: 15px;
-            border-bottom: 1px solid #edf2f7;
-            display: flex;
-            flex-direction: column;
-        }}
-        .feed-item:last-child {{ border-bottom: none; }}
-        .feed-source {{ 
-            font-size: 12px; 
-            text-transform: uppercase; 
-            color: #718096; 
-            font-weight: bold;
-            margin-bottom: 4px;
-        }}
-        .feed-title {{ font-size: 16px; font-weight: 600; margin-bottom: 5px; }}
-        .feed-title a {{ color: #2b6cb0; text-decoration: none; }}
-        .feed-title a:hover {{ text-decoration: underline; }}
-        .feed-date {{ font-size: 12px; color: #a0aec0; }}
+        stats_html = _STATS_TEMPLATE.substitute(
+            llm_calls=self.usage_tracker.llm_calls,
+            llm_input_tokens=self.usage_tracker.llm_input_tokens,
+            llm_output_tokens=self.usage_tracker.llm_output_tokens,
+            youtube_api_calls=self.usage_tracker.youtube_api_calls,
+            youtube_quota=self.usage_tracker.youtube_quota,
+        )
 
-        .video-card {{
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-            border-radius: 12px;
-            padding: 20px;
-            margin: 15px 0;
-            color: white;
-        }}
-        .video-title a {{ color: #ff6b6b; text-decoration: none; }}
-        
-        .footer {{
-            margin-top: 50px;
-            padding-top: 30px;
-            border-top: 2px solid #e2e8f0;
-            text-align: center;
-            color: #718096;
-            font-size: 14px;
-        }}
-        .stats-box {{
-            background: #f1f5f9;
-            border-radius: 8px;
-            padding: 15px;
-            margin-top: 30px;
-            border: 1px solid #e2e8f0;
-            text-align: left;
-        }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <div class="header">
-            <h1>🔬 AI 研究周报</h1>
-            <div class="date">{today}</div>
-        </div>
-        
-        <!-- AI Daily Briefing -->
-        <div class="briefing-box">
-            <div class="briefing-title">☕️ 今日 AI 简报</div>
-            <div style="color: #2c7a7b; font-size: 15px; line-height: 1.8;">
-                {briefing_html}
-            </div>
-        </div>
-        
-        <!-- arXiv Papers -->
-        <div class="section">
-            <div class="section-header">
-                <span class="section-icon">📚</span>
-                <h2 class="section-title">核心论文 (ArXiv)</h2>
-            </div>
-            <h3 style="color: #4a5568; margin-top:20px;">🔥 大模型前沿</h3>
-            {self._generate_papers_html(papers['llm'], 'llm')}
-            
-            <h3 style="color: #4a5568; margin-top:30px;">📊 广告与推荐算法</h3>
-            {self._generate_papers_html(papers['advertising'], 'ad')}
-        </div>
-        
-        <!-- RSS Feeds -->
-        <div class="section">
-            <div class="section-header">
-                <span class="section-icon">📡</span>
-                <h2 class="section-title">业界动态</h2>
-            </div>
-            
-            <div style="display: grid; grid-template-columns: 1fr 1fr; gap: 40px;">
-                <div>
-                    <h3 style="border-bottom: 2px solid #ed8936; padding-bottom: 10px; color: #c05621;">🏢 AI Labs 更新</h3>
-                    {self._generate_feeds_html(feeds.get('AI_Labs', []))}
-                </div>
-                <div>
-                    <h3 style="border-bottom: 2px solid #48bb78; padding-bottom: 10px; color: #2f855a;">💰 顶级风投观点</h3>
-                    {self._generate_feeds_html(feeds.get('VC_Trends', []))}
-                </div>
-            </div>
-            
-            <div style="margin-top: 40px;">
-                 <h3 style="border-bottom: 2px solid #4299e1; padding-bottom: 10px; color: #2b6cb0;">📰 科技新闻精选</h3>
-                 {self._generate_feeds_html(feeds.get('Tech_News', []) + feeds.get('High_Quality_Filters', []))}
-            </div>
-        </div>
-        
-        <!-- YouTube Videos -->
-        <div class="section">
-            <div class="section-header">
-                <span class="section-icon">🎬</span>
-                <h2 class="section-title">科技领袖访谈</h2>
-            </div>
-            {self._generate_youtube_html(youtube_data)}
-        </div>
-        
-        <!-- New Sources: GitHub, Reddit, HN -->
-        {self._generate_community_section(github_data, reddit_posts, hn_stories)}
-        
-        {stats_html}
-        
-        <div class="footer">
-            <p>📅 {today} | Daily Info System</p>
-            <p>💡 Stay Hungry, Stay Foolish</p>
-        </div>
-    </div>
-</body>
-</html>
-'''
-        return html
+        return _DIGEST_TEMPLATE.substitute(
+            today=today,
+            briefing_html=briefing_html,
+            llm_papers_html=self._generate_papers_html(papers['llm'], 'llm'),
+            ad_papers_html=self._generate_papers_html(papers['advertising'], 'ad'),
+            ai_labs_html=self._generate_feeds_html(feeds.get('AI_Labs', [])),
+            vc_html=self._generate_feeds_html(feeds.get('VC_Trends', [])),
+            news_html=self._generate_feeds_html(self._dedup_feed_items(
+                feeds.get('Tech_News', []) + feeds.get('High_Quality_Filters', []))[:8]),
+            youtube_html=self._generate_youtube_html(youtube_data),
+            community_html=self._generate_community_section(github_data, reddit_posts, hn_stories),
+            stats_html=stats_html,
+        )
     
     def _generate_papers_html(self, papers: List[ArxivPaper], paper_type: str) -> str:
         """生成论文 HTML"""
         if not papers:
             return '<p style="color: #718096; font-style: italic;">今日无更新</p>'
         
-        html_parts = []
         card_class = "paper-card" if paper_type == 'llm' else "paper-card ad"
-        
-        for paper in papers[:6]:  # Limit per section
-            authors_str = ', '.join(paper.authors[:3])
-            summary = paper.summary
-            
-            html_parts.append(f'''
-            <div class="{card_class}">
-                <div class="paper-title">
-                    <a href="{paper.abs_url}" target="_blank">{paper.title}</a>
-                </div>
-                <div class="paper-authors">👥 {authors_str}</div>
-                <div class="paper-summary">{summary}</div>
-                <div class="paper-meta">
-                    <span class="paper-tag">📅 {paper.published[:10]}</span>
-                    <a href="{paper.pdf_url}" class="paper-link" target="_blank">📄 PDF</a>
-                </div>
-            </div>
-            ''')
-        return '\n'.join(html_parts)
+
+        # 先把每篇论文整理成模板行字典（纯直线代码的推导式），
+        # 再一次 join 渲染；调用方已按版块切好片
+        rows = [{
+            'cls': card_class,
+            'abs_url': html.escape(paper.abs_url),
+            'title': html.escape(paper.title),
+            'authors': html.escape(', '.join(paper.authors[:3])),
+            'summary': html.escape(paper.summary),
+            'published': paper.published[:10],
+            'pdf_url': html.escape(paper.pdf_url),
+        } for paper in papers]
+        return '\n'.join(_PAPER_CARD_TEMPLATE.substitute(row) for row in rows)
 
     def _generate_feeds_html(self, items: List[FeedItem]) -> str:
         """生成 Feed 列表 HTML"""
         if not items:
             return '<p style="color: #cbd5e0;">暂无动态</p>'
-        
-        html = '<div class="feed-list">'
-        for item in items[:8]: # Limit items per list
-            html += f'''
-            <div class="feed-item">
-                <div class="feed-source">{item.source_name}</div>
-                <div class="feed-title"><a href="{item.link}" target="_blank">{item.title}</a></div>
-                <div class="feed-date">{item.published.strftime('%m-%d')}</div>
-            </div>
-            '''
-        html += '</div>'
-        return html
+
+        # 累加拼接是 O(n²)；攒片段最后 join 一次
+        parts = ['<div class="feed-list">']
+        for item in items: # Caller pre-slices per list
+            parts.append(_FEED_ITEM_TEMPLATE.substitute(
+                source=html.escape(item.source_name),
+                link=html.escape(item.link),
+                title=html.escape(item.title),
+                date=item.published.strftime('%m-%d'),
+            ))
+        parts.append('</div>')
+        return ''.join(parts)
 
     def _generate_youtube_html(self, youtube_data: Dict) -> str:
         """生成 YouTube HTML (Simplified for brevity)"""
@@ -538,78 +817,72 @@ class ResearchDigestSender:
         for leader, videos in videos_by_leader.items():
             if not videos: continue
             html_parts.append(f'<h4 style="margin: 20px 0 10px 0; color: #553c9a;">👤 {leader}</h4>')
-            for video in videos[:2]:
-                html_parts.append(f'''
-                <div class="video-card">
-                    <div class="video-title"><a href="{video.watch_url}" target="_blank">🎥 {video.title}</a></div>
-                    <div style="font-size: 12px; color: #a0aec0; margin-top:5px;">{video.description[:100]}...</div>
-                </div>
-                ''')
+            for video in videos:
+                html_parts.append(_VIDEO_CARD_TEMPLATE.substitute(
+                    watch_url=html.escape(video.watch_url),
+                    title=html.escape(video.title),
+                    description=html.escape(video.description[:100]),
+                ))
         return '\n'.join(html_parts) if html_parts else '<p>暂无新视频</p>'
 
     def _generate_youtube_recommendations_html(self, recommendations: Dict) -> str:
         # Reusing the logic but simplified
-        html = '<p>点击下方链接搜索最新视频：</p><div style="display:flex; gap:10px; flex-wrap:wrap;">'
+        parts = ['<p>点击下方链接搜索最新视频：</p><div style="display:flex; gap:10px; flex-wrap:wrap;">']
         for leader, url in recommendations["search_links"].items():
-            html += f'<a href="{url}" style="padding:5px 15px; background:#e53e3e; color:white; border-radius:15px; text-decoration:none;">{leader}</a>'
-        html += '</div>'
-        return html
+            parts.append(_SEARCH_LINK_TEMPLATE.substitute(url=html.escape(url), leader=html.escape(leader)))
+        parts.append('</div>')
+        return ''.join(parts)
     
+    async def _curate_all(self, jobs: List[tuple]) -> List[str]:
+        """并发执行所有 AI 筛选任务 (纯 I/O 等待，gather 重叠网络 RTT)"""
+        tasks = [
+            self.ai_curator.acurate(items, context, max_items=3)
+            for items, context in jobs
+        ]
+        return await asyncio.gather(*tasks)
+
     def _generate_community_section(self, github_data: Dict, reddit_posts: List, hn_stories: List) -> str:
         """生成开源社区版块 HTML (使用 AI 筛选)"""
         if not github_data and not reddit_posts and not hn_stories:
             return ''
-        
-        sections = []
-        
-        # GitHub Issues
+
+        # 收集待筛选的来源: (标题样式, items, context)
+        jobs = []
+        headers = []
+
         if github_data and github_data.get('issues'):
-            print("  🤖 AI 筛选 GitHub Issues...")
-            issues_dicts = [i.to_dict() for i in github_data['issues']]
-            issues_html = self.ai_curator.curate(issues_dicts, "GitHub 热门 Issues (llama.cpp/vllm/transformers)", max_items=3)
-            sections.append(f'''
-            <div style="margin-bottom: 30px;">
-                <h3 style="border-bottom: 2px solid #6366f1; padding-bottom: 10px; color: #4338ca;">🐙 开源社区动态</h3>
-                {issues_html}
-            </div>
-            ''')
-        
-        # GitHub Trending
+            jobs.append(([i.to_dict() for i in github_data['issues']],
+                         "GitHub 热门 Issues (llama.cpp/vllm/transformers)"))
+            headers.append('<h3 style="border-bottom: 2px solid #6366f1; padding-bottom: 10px; color: #4338ca;">🐙 开源社区动态</h3>')
+
         if github_data and github_data.get('trending'):
-            print("  🤖 AI 筛选 GitHub Trending...")
-            trending_dicts = [t.to_dict() for t in github_data['trending']]
-            trending_html = self.ai_curator.curate(trending_dicts, "GitHub 每日趋势项目", max_items=3)
-            sections.append(f'''
-            <div style="margin-bottom: 30px;">
-                <h3 style="border-bottom: 2px solid #f59e0b; padding-bottom: 10px; color: #d97706;">🔥 GitHub 趋势项目</h3>
-                {trending_html}
-            </div>
-            ''')
-        
-        # Reddit
+            jobs.append(([t.to_dict() for t in github_data['trending']],
+                         "GitHub 每日趋势项目"))
+            headers.append('<h3 style="border-bottom: 2px solid #f59e0b; padding-bottom: 10px; color: #d97706;">🔥 GitHub 趋势项目</h3>')
+
         if reddit_posts:
-            print("  🤖 AI 筛选 Reddit 帖子...")
-            reddit_dicts = [p.to_dict() for p in reddit_posts]
-            reddit_html = self.ai_curator.curate(reddit_dicts, "Reddit r/LocalLLaMA 热议", max_items=3)
-            sections.append(f'''
-            <div style="margin-bottom: 30px;">
-                <h3 style="border-bottom: 2px solid #ef4444; padding-bottom: 10px; color: #dc2626;">🔴 Reddit 热议</h3>
-                {reddit_html}
-            </div>
-            ''')
-        
-        # Hacker News
+            jobs.append(([p.to_dict() for p in reddit_posts],
+                         "Reddit r/LocalLLaMA 热议"))
+            headers.append('<h3 style="border-bottom: 2px solid #ef4444; padding-bottom: 10px; color: #dc2626;">🔴 Reddit 热议</h3>')
+
         if hn_stories:
-            print("  🤖 AI 筛选 Hacker News...")
-            hn_dicts = [s.to_dict() for s in hn_stories]
-            hn_html = self.ai_curator.curate(hn_dicts, "Hacker News AI 相关热帖", max_items=3)
+            jobs.append(([s.to_dict() for s in hn_stories],
+                         "Hacker News AI 相关热帖"))
+            headers.append('<h3 style="border-bottom: 2px solid #f97316; padding-bottom: 10px; color: #ea580c;">🟠 Hacker News 精选</h3>')
+
+        # 并发筛选所有来源，而不是逐个串行等待 LLM
+        print(f"  🤖 AI 并发筛选 {len(jobs)} 个来源...")
+        curated = asyncio.run(self._curate_all(jobs))
+
+        sections = []
+        for header, curated_html in zip(headers, curated):
             sections.append(f'''
             <div style="margin-bottom: 30px;">
-                <h3 style="border-bottom: 2px solid #f97316; padding-bottom: 10px; color: #ea580c;">🟠 Hacker News 精选</h3>
-                {hn_html}
+                {header}
+                {curated_html}
             </div>
             ''')
-        
+
         # Merge AI curator usage into main tracker
         curator_usage = self.ai_curator.get_usage()
         self.usage_tracker.llm_calls += curator_usage['calls']
@@ -628,64 +901,118 @@ class ResearchDigestSender:
             '''
         return ''
 
-    def send_email(self, to_email: str, subject: str, content: str, cc_emails: List[str] = []) -> bool:
-        """发送邮件 (支持 CC)"""
-        smtp_server = os.getenv('SMTP_SERVER', 'smtp.qq.com')
-        smtp_port = int(os.getenv('SMTP_PORT', '465'))
-        from_email = os.getenv('FROM_EMAIL')
-        email_password = os.getenv('EMAIL_PASSWORD')
-        
-        if not from_email or not email_password:
+    def _smtp_connect(self):
+        """建立并登录 SMTP 连接 (465 走 SSL，其他端口走 STARTTLS)"""
+        import smtplib
+
+        cfg = self._smtp_cfg
+        if cfg.port == 465:
+            import ssl
+            context = ssl.create_default_context()
+            server = smtplib.SMTP_SSL(cfg.server, cfg.port, context=context)
+        else:
+            server = smtplib.SMTP(cfg.server, cfg.port)
+            server.starttls()
+
+        server.login(cfg.user, cfg.password)
+        return server
+
+    def send_emails(self, deliveries: List[tuple], server=None) -> bool:
+        """在一条 SMTP 会话里发送多封邮件
+
+        Args:
+            deliveries: (to_email, cc_emails, subject, content) 列表，
+                全部复用同一次 TLS 握手 + AUTH。
+            server: 可选的已连接 SMTP 会话（run() 里提前在后台握手，
+                把 TLS 往返藏在 HTML 生成后面）。首次尝试直接复用，
+                重试时重新连接。
+
+        瞬时 SMTP 错误指数退避重试；重试只从第一封未投递的邮件继续，
+        已经发出去的不会重发（避免收件人收到重复日报）。
+        """
+        # 延迟导入: 只有真正发信时才加载 SMTP/email 栈（见模块 docstring）
+        import smtplib
+        from email import policy as email_policy
+        from email.mime.text import MIMEText
+        from email.mime.multipart import MIMEMultipart
+
+        from_email = self._smtp_cfg.user
+        if not from_email or not self._smtp_cfg.password:
             print("❌ 错误: 未设置邮件配置环境变量")
             return False
-        
-        try:
-            message = MIMEMultipart('alternative')
-            message['From'] = from_email
-            message['To'] = to_email
-            message['Subject'] = Header(subject, 'utf-8')
-            
-            if cc_emails:
-                message['Cc'] = ', '.join(cc_emails)
-            
-            message.attach(MIMEText(content, 'html', 'utf-8'))
-            
-            print(f"\n📧 正在连接邮件服务器...")
-            if smtp_port == 465:
-                import ssl
-                context = ssl.create_default_context()
-                server = smtplib.SMTP_SSL(smtp_server, smtp_port, context=context)
-            else:
-                server = smtplib.SMTP(smtp_server, smtp_port)
-                server.starttls()
-            
-            server.login(from_email, email_password)
-            
-            # Recipients = To + Cc
-            recipients = [to_email] + cc_emails
-            
-            print(f"🚀 正在发送邮件给: {recipients}...")
-            server.sendmail(from_email, recipients, message.as_string())
-            server.quit()
-            
-            print(f"✅ 邮件发送成功！")
-            return True
-            
-        except Exception as e:
-            print(f"❌ 发送邮件失败: {e}")
-            return False
+
+        sent = 0  # 已成功投递的数量；重试从这里继续
+        for attempt in range(3):
+            try:
+                if server is None:
+                    print(f"\n📧 正在连接邮件服务器...")
+                    server = self._smtp_connect()
+                try:
+                    for to_email, cc_emails, subject, content in deliveries[sent:]:
+                        cc_emails = cc_emails or []
+                        # SMTP policy 让生成器原生输出 CRLF，配合
+                        # send_message 直接写 socket，省掉 as_string()
+                        # 的整树序列化 + sendmail 的换行重写两趟拷贝
+                        message = MIMEMultipart('alternative', policy=email_policy.SMTP)
+                        message['From'] = from_email
+                        message['To'] = to_email
+                        # 现代 policy 直接收 str，非 ASCII 自动做 RFC2047
+                        # 编码，不再需要 Header 包装
+                        message['Subject'] = subject
+
+                        if cc_emails:
+                            message['Cc'] = ', '.join(cc_emails)
+
+                        message.attach(MIMEText(content, 'html', 'utf-8'))
+
+                        # Recipients = To + Cc
+                        recipients = [to_email] + cc_emails
+
+                        print(f"🚀 正在发送邮件给: {recipients}...")
+                        server.send_message(message, from_addr=from_email, to_addrs=recipients)
+                        sent += 1
+                finally:
+                    server.quit()
+                    server = None
+
+                print(f"✅ 邮件发送成功！")
+                return True
+
+            except (smtplib.SMTPException, OSError) as e:
+                # 连接已不可信，重试时走全新握手
+                server = None
+                if sent == len(deliveries):
+                    # 全部邮件已投递，只是 quit 挂断时出错——不算失败，
+                    # 更不能整批重发
+                    print(f"✅ 邮件发送成功！(挂断时出错: {e})")
+                    return True
+                print(f"⚠️ SMTP 发送失败 (第 {attempt + 1}/3 次，"
+                      f"已投递 {sent}/{len(deliveries)}): {e}")
+                if attempt < 2:
+                    time.sleep(2 ** attempt)
+            except Exception as e:
+                print(f"❌ 发送邮件失败: {e}")
+                return False
+
+        return False
+
+    def send_email(self, to_email: str, subject: str, content: str,
+                   cc_emails: Optional[List[str]] = None, server=None) -> bool:
+        """发送单封邮件 (支持 CC)"""
+        return self.send_emails([(to_email, cc_emails or [], subject, content)],
+                                server=server)
     
 
-    def save_report_to_file(self, html_content: str):
+    def save_report_to_file(self, html_content: str, now: Optional[datetime] = None):
         """保存日报到本地 archives 文件夹"""
         try:
             # 确保目录存在
             archive_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'archives')
             if not os.path.exists(archive_dir):
                 os.makedirs(archive_dir)
-            
+
             # 生成文件名
-            date_str = datetime.now().strftime('%Y-%m-%d')
+            date_str = (now or datetime.now()).strftime('%Y-%m-%d')
             filename = f"daily_report_{date_str}.html"
             filepath = os.path.join(archive_dir, filename)
             
@@ -704,7 +1031,11 @@ class ResearchDigestSender:
         print("\n" + "=" * 60)
         print("🚀 启动 AI 研究与资讯抓取任务")
         print("=" * 60)
-        
+
+        # 整次运行共用同一时间戳：邮件正文、主题、存档文件名在
+        # 跨午夜运行时保持一致
+        now = datetime.now()
+
         if to_email is None:
             to_email = os.getenv('TO_EMAIL', 'huzhe06@gmail.com')
         
@@ -715,34 +1046,67 @@ class ResearchDigestSender:
             cc_list.extend([email.strip() for email in extra_cc.split(',')])
 
         # 1. Fetch all data sources
-        papers = self.fetch_arxiv_papers()
-        feeds = self.fetch_feeds()
-        youtube_data = self.fetch_youtube_videos()
+        # arXiv / RSS / YouTube 三个来源相互独立且都在等外部 HTTP，
+        # 并发后抓取阶段的耗时从三者之和降到最慢的那个
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            future_papers = executor.submit(self.fetch_arxiv_papers)
+            future_feeds = executor.submit(self.fetch_feeds)
+            future_youtube = executor.submit(self.fetch_youtube_videos)
+            papers = future_papers.result()
+            feeds = future_feeds.result()
+            youtube_data = future_youtube.result()
         github_data = self.fetch_github_data()
         reddit_posts = self.fetch_reddit_data()
         hn_stories = self.fetch_hn_data()
         
-        # 2. Generate Briefing
-        briefing = self.generate_daily_briefing(papers, feeds, youtube_data)
-        
+        # 2. Generate Summaries + Briefing
+        # 简报只用标题，不依赖摘要结果；两个独立的 LLM 等待并行后，
+        # 简报的 2-5 秒完全隐藏在摘要批处理后面
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            future_summaries = executor.submit(self.summarize_papers, papers)
+            future_briefing = executor.submit(self.generate_daily_briefing, papers, feeds, youtube_data)
+            future_summaries.result()
+            briefing = future_briefing.result()
+
         # 3. Generate Email Content
+        # SMTP 握手 (TCP + TLS + AUTH，≥3 个往返) 和 HTML 组装互不依赖，
+        # 先在后台线程发起连接，把握手延迟藏在模板渲染后面
+        smtp_executor = ThreadPoolExecutor(max_workers=1)
+        smtp_future = None
+        if self._smtp_cfg.user and self._smtp_cfg.password:
+            smtp_future = smtp_executor.submit(self._smtp_connect)
+
         print("\n🎨 正在生成 HTML 邮件...")
         html_content = self.generate_html_content(
             briefing, papers, feeds, youtube_data,
             github_data=github_data,
             reddit_posts=reddit_posts,
-            hn_stories=hn_stories
+            hn_stories=hn_stories,
+            now=now
         )
-        
-        # 3.1 Save report and deduplication state
-        self.save_report_to_file(html_content)
-        self.deduplicator.save()
-        
-        # 4. Send Email
-        today = datetime.now().strftime('%m月%d日')
+
+        # 3.1 + 4. Save report / dedup state and send email
+        # 存档写盘、去重状态落盘和 SMTP 发送互不依赖；写盘藏在
+        # 2-5 秒的 SMTP 连接+发送后面，发送失败也不影响存档落地
+        today = now.strftime('%m月%d日')
         subject = f"日报 | AI 每日简报 & 研究动态 ({today})"
-        
-        success = self.send_email(to_email, subject, html_content, cc_emails=cc_list)
+
+        # 收取预热的连接；失败不致命，send_emails 会自己重连重试
+        smtp_server = None
+        if smtp_future is not None:
+            try:
+                smtp_server = smtp_future.result()
+            except Exception as e:
+                print(f"⚠️ SMTP 预连接失败，发送时将重连: {e}")
+        smtp_executor.shutdown(wait=False)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            executor.submit(self.save_report_to_file, html_content, now)
+            send_future = executor.submit(
+                self.send_email, to_email, subject, html_content, cc_list,
+                smtp_server)
+            self.deduplicator.save()
+            success = send_future.result()
         return success
 
 
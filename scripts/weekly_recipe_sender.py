@@ -17,6 +17,12 @@ from datetime import datetime, timedelta
 from ingredient_links import get_ingredient_link, extract_ingredients
 
 
+# 模块加载时编译一次，健康筛选遍历菜谱文件时不再重复解析 pattern
+# 注意用 (?:...) 分组做多选一：原先的 [大豆油|油|...] 是字符类，语义不对
+_OIL_RE = re.compile(r'(\d+)g?\s*(?:大豆油|食用油|花生油|油)')
+_SALT_RE = re.compile(r'(\d+)g?\s*盐')
+
+
 class WeeklyRecipeSender:
     def __init__(self):
         self.base_dir = Path(__file__).parent.parent / "cookReminder"
@@ -59,12 +65,10 @@ class WeeklyRecipeSender:
                 content = f.read()
             
             # 检查油的用量（克数）
-            oil_pattern = r'(\d+)g?\s*[大豆油|油|食用油|花生油]'
-            oil_matches = re.findall(oil_pattern, content)
-            
+            oil_matches = _OIL_RE.findall(content)
+
             # 检查盐的用量（克数）
-            salt_pattern = r'(\d+)g?\s*盐'
-            salt_matches = re.findall(salt_pattern, content)
+            salt_matches = _SALT_RE.findall(content)
             
             # 计算油盐用量
             total_oil = sum([int(m) for m in oil_matches]) if oil_matches else 0
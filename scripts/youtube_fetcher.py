@@ -8,8 +8,10 @@ YouTube 视频获取模块
 import os
 import json
 import re
+import threading
 import urllib.request
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from typing import List, Optional, Dict
@@ -108,6 +110,8 @@ class YouTubeFetcher:
         self.total_quota_used = 0
         self.request_count = 0
         self.request_log = []
+        # 各领袖并发抓取后，配额记账会被多个线程同时更新
+        self._quota_lock = threading.Lock()
     
     def _make_request(self, endpoint: str, params: dict) -> dict:
         """发送 API 请求"""
@@ -121,13 +125,14 @@ class YouTubeFetcher:
         elif 'videos' in endpoint:
             quota_cost = self.QUOTA_COST_VIDEOS
             
-        self.total_quota_used += quota_cost
-        self.request_count += 1
-        self.request_log.append({
-            'endpoint': endpoint,
-            'cost': quota_cost,
-            'time': datetime.now().isoformat()
-        })
+        with self._quota_lock:
+            self.total_quota_used += quota_cost
+            self.request_count += 1
+            self.request_log.append({
+                'endpoint': endpoint,
+                'cost': quota_cost,
+                'time': datetime.now().isoformat()
+            })
         
         params['key'] = self.api_key
         url = f"{self.BASE_URL}/{endpoint}?{urllib.parse.urlencode(params)}"
@@ -341,14 +346,19 @@ class YouTubeFetcher:
         if leaders is None:
             leaders = ["Elon Musk", "Jensen Huang", "Sam Altman"]
         
-        result = {}
-        
-        for leader_name in leaders:
-            if leader_name in self.TECH_LEADERS:
-                print(f"正在获取 {leader_name} 的视频...")
-                result[leader_name] = self.fetch_leader_videos(leader_name)
-                print(f"  找到 {len(result[leader_name])} 个视频")
-        
+        # 各领袖的搜索相互独立且纯属网络等待，并发后这一阶段的
+        # 耗时从各领袖之和降到最慢的那位
+        selected = [name for name in leaders if name in self.TECH_LEADERS]
+        if not selected:
+            return {}
+
+        print(f"正在并发获取 {len(selected)} 位领袖的视频...")
+        with ThreadPoolExecutor(max_workers=len(selected)) as executor:
+            videos_per_leader = executor.map(self.fetch_leader_videos, selected)
+            result = dict(zip(selected, videos_per_leader))
+
+        for leader_name, videos in result.items():
+            print(f"  {leader_name}: 找到 {len(videos)} 个视频")
         return result
     
     def print_quota_usage(self):